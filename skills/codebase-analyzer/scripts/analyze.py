@@ -12,15 +12,26 @@ from __future__ import annotations
 
 import argparse
 import ast
+import os
+import re
 import sys
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 
 # Add parent directory to path for internal imports
 sys.path.insert(0, str(Path(__file__).parent))
 
+from internal.cache import file_key, load_cache, lookup, save_cache
 from internal.file_utils import find_python_files
 from internal.output import Timer, emit, error_response, success_response
+from internal.pool import pool_map, worth_pooling
+
+
+# Bump the version whenever the structure output format changes
+_STRUCTURE_CACHE = "structure_v1"
 
 
 def _get_docstring(node: ast.ClassDef | ast.FunctionDef | ast.AsyncFunctionDef) -> str | None:
@@ -34,6 +45,26 @@ def _get_docstring(node: ast.ClassDef | ast.FunctionDef | ast.AsyncFunctionDef)
     return None
 
 
+def _dotted(node: ast.expr) -> str:
+    """Render a Name or dotted Attribute chain ("a.b.c") without ast.unparse.
+
+    Anything else (subscripts, calls, operators, string annotations) falls
+    back to ast.unparse.
+    """
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        parts = [node.attr]
+        value = node.value
+        while isinstance(value, ast.Attribute):
+            parts.append(value.attr)
+            value = value.value
+        if isinstance(value, ast.Name):
+            parts.append(value.id)
+            return ".".join(reversed(parts))
+    return ast.unparse(node)
+
+
 def _get_decorators(node: ast.ClassDef | ast.FunctionDef | ast.AsyncFunctionDef) -> list[str]:
     """Extract decorator names from a class or function node."""
     decorators = []
@@ -41,12 +72,12 @@ def _get_decorators(node: ast.ClassDef | ast.FunctionDef | ast.AsyncFunctionDef)
         if isinstance(dec, ast.Name):
             decorators.append(dec.id)
         elif isinstance(dec, ast.Attribute):
-            decorators.append(ast.unparse(dec))
+            decorators.append(_dotted(dec))
         elif isinstance(dec, ast.Call):
             if isinstance(dec.func, ast.Name):
                 decorators.append(dec.func.id)
             elif isinstance(dec.func, ast.Attribute):
-                decorators.append(ast.unparse(dec.func))
+                decorators.append(_dotted(dec.func))
     return decorators
 
 
@@ -57,7 +88,7 @@ def _get_base_classes(node: ast.ClassDef) -> list[str]:
         if isinstance(base, ast.Name):
             bases.append(base.id)
         elif isinstance(base, ast.Attribute):
-            bases.append(ast.unparse(base))
+            bases.append(_dotted(base))
     return bases
 
 
@@ -65,99 +96,182 @@ def _get_type_annotation(arg: ast.arg) -> str | None:
     """Extract type annotation string from a function argument."""
     if arg.annotation is None:
         return None
-    return ast.unparse(arg.annotation)
+    return _dotted(arg.annotation)
 
 
 def _get_return_annotation(node: ast.FunctionDef | ast.AsyncFunctionDef) -> str | None:
     """Extract return type annotation from a function definition."""
     if node.returns is None:
         return None
-    return ast.unparse(node.returns)
+    return _dotted(node.returns)
 
 
-def extract_structure(filepath: Path) -> dict | None:
-    """Extract classes and functions from a Python file.
+# Statement-list fields; class/def nodes can only appear inside these. Listed
+# in the order the nodes declare them (Try: body, handlers, orelse,
+# finalbody), so definitions come out in the same order as with ast.walk
+_BLOCK_FIELDS = ("body", "handlers", "orelse", "finalbody", "cases")
 
-    Args:
-        filepath: Path to the Python file
 
-    Returns:
-        Dictionary with classes and functions, or None on error
+def _iter_definitions(tree: ast.Module):
+    """Yield every class and function definition in the module, breadth-first.
+
+    Unlike ast.walk, this only descends through statement blocks, so the
+    (much larger) expression subtrees are never visited.
+    """
+    queue = deque(tree.body)
+    while queue:
+        node = queue.popleft()
+        if isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            yield node
+        for field in _BLOCK_FIELDS:
+            block = getattr(node, field, None)
+            if block:
+                queue.extend(block)
+
+
+def _parse(filepath: Path, source: bytes | None = None) -> ast.Module | None:
+    """Read and parse a Python file, returning None if it can't be parsed.
+
+    If source is given (already read by _read_ahead), the file isn't re-read.
+    Bytes go straight to ast.parse, which honors any coding declaration
+    itself, so there's no separate decode pass.
     """
     try:
-        content = filepath.read_text()
-        tree = ast.parse(content)
-    except (SyntaxError, FileNotFoundError, PermissionError, UnicodeDecodeError):
+        content = filepath.read_bytes() if source is None else source
+        return ast.parse(content)
+    except (SyntaxError, FileNotFoundError, PermissionError, UnicodeDecodeError, ValueError):
         return None
 
-    classes = []
-    functions = []
 
-    for node in ast.iter_child_nodes(tree):
-        if isinstance(node, ast.ClassDef):
-            methods = []
-            for item in node.body:
-                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                    method_info = {"name": item.name}
-                    method_decorators = _get_decorators(item)
-                    if method_decorators:
-                        method_info["decorators"] = method_decorators
-                    methods.append(item.name)
-
-            class_info: dict = {
-                "name": node.name,
-                "line": node.lineno,
-                "methods": methods,
-            }
-
-            bases = _get_base_classes(node)
-            if bases:
-                class_info["bases"] = bases
-
-            decorators = _get_decorators(node)
-            if decorators:
-                class_info["decorators"] = decorators
-
-            docstring = _get_docstring(node)
-            if docstring:
-                class_info["docstring"] = docstring
-
-            classes.append(class_info)
+# ASCII-only lowercase table; identifiers are overwhelmingly ASCII
+_ASCII_LOWER = bytes.maketrans(bytes(range(65, 91)), bytes(range(97, 123)))
 
-        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-            params = [arg.arg for arg in node.args.args]
 
-            func_info: dict = {
-                "name": node.name,
-                "line": node.lineno,
-                "params": params,
-            }
+def _may_contain(source: bytes, pattern: str) -> bool:
+    """Cheap case-insensitive check that pattern occurs anywhere in source.
 
-            # Add type annotations for params (only if at least one exists)
-            type_hints = {}
-            for arg in node.args.args:
-                ann = _get_type_annotation(arg)
-                if ann:
-                    type_hints[arg.arg] = ann
-            if type_hints:
-                func_info["type_hints"] = type_hints
+    A False result means no name can match, so parsing/regex scanning can be
+    skipped. Non-ASCII patterns always return True (ASCII folding can't rule
+    them out).
+    """
+    if not pattern.isascii():
+        return True
+    return pattern.encode().translate(_ASCII_LOWER) in source.translate(_ASCII_LOWER)
 
-            ret = _get_return_annotation(node)
-            if ret:
-                func_info["returns"] = ret
 
-            decorators = _get_decorators(node)
-            if decorators:
-                func_info["decorators"] = decorators
+def _read_file(filepath: Path) -> bytes | None:
+    """Read a file's bytes, or None if it can't be read."""
+    try:
+        return filepath.read_bytes()
+    except OSError:
+        return None
 
-            docstring = _get_docstring(node)
-            if docstring:
-                func_info["docstring"] = docstring
 
-            if isinstance(node, ast.AsyncFunctionDef):
-                func_info["async"] = True
+def _read_ahead(paths: Iterable[Path], depth: int = 64) -> Iterator[bytes | None]:
+    """Yield each file's bytes in order while reading up to depth files ahead.
 
-            functions.append(func_info)
+    File reads release the GIL, so the reader threads overlap disk latency
+    with parsing in the consuming thread. Unreadable files yield None.
+    """
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        pending = deque()
+        for path in paths:
+            pending.append(executor.submit(_read_file, path))
+            if len(pending) >= depth:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _class_info(node: ast.ClassDef) -> dict:
+    """Build the structure entry for a top-level class."""
+    methods = [
+        item.name for item in node.body
+        if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef))
+    ]
+
+    class_info: dict = {
+        "name": node.name,
+        "line": node.lineno,
+        "methods": methods,
+    }
+
+    bases = _get_base_classes(node)
+    if bases:
+        class_info["bases"] = bases
+
+    decorators = _get_decorators(node)
+    if decorators:
+        class_info["decorators"] = decorators
+
+    docstring = _get_docstring(node)
+    if docstring:
+        class_info["docstring"] = docstring
+
+    return class_info
+
+
+def _function_info(node: ast.FunctionDef | ast.AsyncFunctionDef) -> dict:
+    """Build the structure entry for a top-level function."""
+    params = [arg.arg for arg in node.args.args]
+
+    func_info: dict = {
+        "name": node.name,
+        "line": node.lineno,
+        "params": params,
+    }
+
+    # Add type annotations for params (only if at least one exists)
+    type_hints = {}
+    for arg in node.args.args:
+        ann = _get_type_annotation(arg)
+        if ann:
+            type_hints[arg.arg] = ann
+    if type_hints:
+        func_info["type_hints"] = type_hints
+
+    ret = _get_return_annotation(node)
+    if ret:
+        func_info["returns"] = ret
+
+    decorators = _get_decorators(node)
+    if decorators:
+        func_info["decorators"] = decorators
+
+    docstring = _get_docstring(node)
+    if docstring:
+        func_info["docstring"] = docstring
+
+    if isinstance(node, ast.AsyncFunctionDef):
+        func_info["async"] = True
+
+    return func_info
+
+
+def extract_structure(filepath: Path, tree: ast.Module | None = None) -> dict | None:
+    """Extract classes and functions from a Python file.
+
+    Args:
+        filepath: Path to the Python file
+        tree: Already-parsed module for filepath (parsed here if omitted)
+
+    Returns:
+        Dictionary with classes and functions, or None on error
+    """
+    if tree is None:
+        tree = _parse(filepath)
+        if tree is None:
+            return None
+
+    classes = []
+    functions = []
+
+    # Exact-type checks: cheaper than isinstance, and still narrow the type
+    for node in tree.body:
+        if type(node) is ast.ClassDef:
+            classes.append(_class_info(node))
+        elif type(node) is ast.FunctionDef or type(node) is ast.AsyncFunctionDef:
+            functions.append(_function_info(node))
 
     if not classes and not functions:
         return None
@@ -168,12 +282,13 @@ def extract_structure(filepath: Path) -> dict | None:
     }
 
 
-def search_pattern(filepath: Path, pattern: str) -> list[dict]:
+def search_pattern(filepath: Path, pattern: str, tree: ast.Module | None = None) -> list[dict]:
     """Search for a pattern in file content and structure.
 
     Args:
         filepath: Path to the Python file
         pattern: Pattern to search for (case-insensitive)
+        tree: Already-parsed module for filepath (parsed here if omitted)
 
     Returns:
         List of matches with context
@@ -181,14 +296,16 @@ def search_pattern(filepath: Path, pattern: str) -> list[dict]:
     matches = []
     pattern_lower = pattern.lower()
 
-    try:
-        content = filepath.read_text()
-        tree = ast.parse(content)
-    except (SyntaxError, FileNotFoundError, PermissionError, UnicodeDecodeError):
-        return []
+    if tree is None:
+        source = _read_file(filepath)
+        if source is None or not _may_contain(source, pattern):
+            return []
+        tree = _parse(filepath, source)
+        if tree is None:
+            return []
 
     # Search in class names
-    for node in ast.walk(tree):
+    for node in _iter_definitions(tree):
         if isinstance(node, ast.ClassDef):
             if pattern_lower in node.name.lower():
                 matches.append({
@@ -197,7 +314,7 @@ def search_pattern(filepath: Path, pattern: str) -> list[dict]:
                     "line": node.lineno,
                     "file": str(filepath),
                 })
-        elif isinstance(node, ast.FunctionDef):
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
             if pattern_lower in node.name.lower():
                 matches.append({
                     "type": "function",
@@ -209,36 +326,275 @@ def search_pattern(filepath: Path, pattern: str) -> list[dict]:
     return matches
 
 
-def analyze_file_worker(args: tuple[Path, str | None, bool]) -> dict:
-    """Worker function for parallel file analysis.
+def compile_pattern(pattern: str) -> re.Pattern[bytes]:
+    """Compile a regex finding class/def lines whose name contains pattern.
+
+    Used to pick which files are worth parsing for a --pattern search; hits
+    are confirmed with search_pattern, since the regex can't tell code from
+    strings. It works on raw file bytes so sources never need decoding, and
+    bytes >= 0x80 count as name characters to cover non-ASCII identifiers.
+
+    Args:
+        pattern: Literal name fragment (case-insensitive)
+
+    Returns:
+        Compiled regex
+    """
+    name = re.escape(pattern.encode())
+    return re.compile(
+        rb"^[ \t\f]*(?:async[ \t]+)?(?:class|def)[ \t]+[\w\x80-\xff]*" + name + rb"[\w\x80-\xff]*(?=[ \t]*[(:\[])",
+        re.IGNORECASE | re.MULTILINE,
+    )
+
+
+def _worker_pattern_only(
+    filepath: Path,
+    source: bytes | None = None,
+    *,
+    pattern: str,
+    pattern_regex: re.Pattern[bytes] | None,
+) -> dict:
+    """Worker for --pattern alone: only files the regex hits get parsed.
+
+    The regex can't tell code from strings, so hits are confirmed with
+    search_pattern; results match a --pattern --structure run.
 
     Args:
-        args: Tuple of (filepath, pattern, include_structure)
+        filepath: Path to the Python file
+        source: File contents, if already read (otherwise read here)
+        pattern: Pattern to search for
+        pattern_regex: Compiled pattern from compile_pattern, or None for
+            non-ASCII patterns (bytes regexes only fold ASCII case)
 
     Returns:
         Analysis result for the file
     """
-    filepath, pattern, include_structure = args
     result: dict = {"file": str(filepath)}
-
-    if pattern:
-        matches = search_pattern(filepath, pattern)
+    if source is None:
+        source = _read_file(filepath)
+    # Most files never mention the pattern; skip searching them outright
+    if source is None or not _may_contain(source, pattern):
+        return result
+    if pattern_regex is not None and not pattern_regex.search(source):
+        return result
+    tree = _parse(filepath, source)
+    if tree is not None:
+        matches = search_pattern(filepath, pattern, tree)
         if matches:
             result["pattern_matches"] = matches
+    return result
+
 
-    if include_structure:
-        structure = extract_structure(filepath)
+def _worker_structure_only(filepath: Path, source: bytes | None = None) -> dict:
+    """Worker for --structure alone.
+
+    Args:
+        filepath: Path to the Python file
+        source: File contents, if already read (otherwise read here)
+
+    Returns:
+        Analysis result for the file
+    """
+    result: dict = {"file": str(filepath)}
+    if source is None:
+        source = _read_file(filepath)
+        if source is None:
+            return result
+    tree = _parse(filepath, source)
+    if tree is not None:
+        structure = extract_structure(filepath, tree)
         if structure:
             result["structure"] = structure
+    return result
 
+
+def _worker_both(filepath: Path, source: bytes | None = None, *, pattern: str) -> dict:
+    """Worker for --pattern with --structure, sharing one parse between them.
+
+    Args:
+        filepath: Path to the Python file
+        source: File contents, if already read (otherwise read here)
+        pattern: Pattern to search for
+
+    Returns:
+        Analysis result for the file
+    """
+    result: dict = {"file": str(filepath)}
+    if source is None:
+        source = _read_file(filepath)
+        if source is None:
+            return result
+    tree = _parse(filepath, source)
+    if tree is None:
+        return result
+
+    if _may_contain(source, pattern):
+        matches = search_pattern(filepath, pattern, tree)
+        if matches:
+            result["pattern_matches"] = matches
+
+    structure = extract_structure(filepath, tree)
+    if structure:
+        result["structure"] = structure
     return result
 
 
+def _worker_pattern_ast(filepath: Path, source: bytes | None = None, *, pattern: str) -> dict:
+    """Worker for pattern search over the AST, for files whose structure is cached.
+
+    Uses the same matcher as _worker_both, so cached and uncached files in
+    a --pattern --structure run report matches identically.
+
+    Args:
+        filepath: Path to the Python file
+        source: File contents, if already read (otherwise read here)
+        pattern: Pattern to search for
+
+    Returns:
+        Analysis result for the file
+    """
+    result: dict = {"file": str(filepath)}
+    if source is None:
+        source = _read_file(filepath)
+    if source is None or not _may_contain(source, pattern):
+        return result
+    tree = _parse(filepath, source)
+    if tree is not None:
+        matches = search_pattern(filepath, pattern, tree)
+        if matches:
+            result["pattern_matches"] = matches
+    return result
+
+
+def _worker_noop(filepath: Path, source: bytes | None = None) -> dict:
+    """Worker for when neither mode is on: nothing to compute."""
+    return {"file": str(filepath)}
+
+
+def _select_worker(pattern: str | None, structure: bool) -> Callable[..., dict]:
+    """Pick the worker specialized for the requested modes.
+
+    Deciding once here keeps the per-file path free of mode checks. The
+    result is a partial over a module-level function, so it pickles for
+    the process pool.
+
+    Args:
+        pattern: Optional pattern to search for
+        structure: Whether to extract code structure
+
+    Returns:
+        Callable taking (filepath, source=None) and returning a file result
+    """
+    if pattern and structure:
+        return partial(_worker_both, pattern=pattern)
+    if pattern:
+        pattern_regex = compile_pattern(pattern) if pattern.isascii() else None
+        return partial(_worker_pattern_only, pattern=pattern, pattern_regex=pattern_regex)
+    if structure:
+        return _worker_structure_only
+    return _worker_noop
+
+
+def _safe_call(worker: Callable[..., dict], filepath: Path) -> dict:
+    """Run worker on filepath, reducing any failure to an empty result.
+
+    Executor.map re-raises worker exceptions in the parent and abandons the
+    remaining results, so per-file failures are contained here instead.
+    """
+    try:
+        return worker(filepath)
+    except Exception:
+        return {"file": str(filepath)}
+
+
+def _relative_path(file: str, prefix: str, base: Path) -> str:
+    """Make file relative to base, given prefix = base with a trailing separator.
+
+    Returns file unchanged if it isn't under base.
+    """
+    if file.startswith(prefix):
+        return file[len(prefix):]
+    try:
+        return str(Path(file).relative_to(base))
+    except ValueError:
+        return file
+
+
+def _run_workers(worker: Callable[..., dict], files: list[Path], parallel: int) -> list[dict]:
+    """Run worker over files, in the process pool when it's worth it.
+
+    Args:
+        worker: Callable from _select_worker
+        files: Files to process
+        parallel: Number of parallel workers
+
+    Returns:
+        One result per file, in the order of files
+    """
+    if worth_pooling(parallel, len(files)):
+        return pool_map(partial(_safe_call, worker), files, parallel)
+
+    # Sequential processing, with file reads overlapped against parsing
+    sources = _read_ahead(files)
+    return [worker(f, source) for f, source in zip(files, sources)]
+
+
+def _run_cached(
+    worker: Callable[..., dict],
+    files: list[Path],
+    root: Path,
+    pattern: str | None,
+    parallel: int,
+) -> list[dict]:
+    """Like _run_workers, but reuse cached structure for unchanged files.
+
+    Files whose (mtime, size) match the cache skip parsing unless a pattern
+    search needs their tree. The cache is rewritten with this run's files.
+
+    Args:
+        worker: Callable from _select_worker (structure mode)
+        files: Files to process
+        root: Analyzed directory, which scopes the cache
+        pattern: Optional pattern to search for
+        parallel: Number of parallel workers
+
+    Returns:
+        One result per file, in the order of files
+    """
+    entries = load_cache(_STRUCTURE_CACHE, root)
+    keys = {}
+    cached = {}
+    for f in files:
+        key = keys[f] = file_key(f)
+        hit, value = lookup(entries, f, key)
+        if hit:
+            cached[f] = value
+
+    misses = [f for f in files if f not in cached]
+    by_file = dict(zip(misses, _run_workers(worker, misses, parallel)))
+
+    hits = [f for f in files if f in cached]
+    if pattern:
+        hit_worker = partial(_worker_pattern_ast, pattern=pattern)
+        by_file.update(zip(hits, _run_workers(hit_worker, hits, parallel)))
+    for f in hits:
+        result = by_file.setdefault(f, {"file": str(f)})
+        if cached[f]:
+            result["structure"] = cached[f]
+
+    save_cache(_STRUCTURE_CACHE, root, {
+        str(f): [*keys[f], by_file[f].get("structure")]
+        for f in files if keys[f] is not None
+    })
+    return [by_file[f] for f in files]
+
+
 def run_analyze(
     directory: str,
     pattern: str | None = None,
     structure: bool = False,
     parallel: int = 1,
+    cache: bool = False,
 ) -> dict:
     """Run comprehensive analysis on a directory.
 
@@ -247,6 +603,7 @@ def run_analyze(
         pattern: Optional pattern to search for
         structure: Whether to extract code structure
         parallel: Number of parallel workers
+        cache: Reuse and update on-disk structure results for unchanged files
 
     Returns:
         Structured result dictionary
@@ -277,42 +634,27 @@ def run_analyze(
             details={"path": str(dir_path)},
         )
 
-    # Prepare work items
-    work_items = [(f, pattern, structure) for f in python_files]
+    # Specialize the per-file worker for the requested modes
+    worker = _select_worker(pattern, structure)
 
     # Process files
     pattern_matches: list[dict] = []
     structure_data = {}
 
-    if parallel > 1:
-        # Parallel processing
-        with ProcessPoolExecutor(max_workers=parallel) as executor:
-            futures = {
-                executor.submit(analyze_file_worker, item): item[0]
-                for item in work_items
-            }
-            for future in as_completed(futures):
-                try:
-                    result = future.result()
-                    if "pattern_matches" in result:
-                        pattern_matches.extend(result["pattern_matches"])
-                    if "structure" in result:
-                        rel_path = str(Path(result["file"]).relative_to(dir_path))
-                        structure_data[rel_path] = result["structure"]
-                except Exception:
-                    pass
+    if cache and structure:
+        results = _run_cached(worker, python_files, dir_path, pattern, parallel)
     else:
-        # Sequential processing
-        for item in work_items:
-            result = analyze_file_worker(item)
-            if "pattern_matches" in result:
-                pattern_matches.extend(result["pattern_matches"])
-            if "structure" in result:
-                try:
-                    rel_path = str(Path(result["file"]).relative_to(dir_path))
-                except ValueError:
-                    rel_path = result["file"]
-                structure_data[rel_path] = result["structure"]
+        results = _run_workers(worker, python_files, parallel)
+
+    # Every discovered file lives under dir_path, so a string prefix strip is
+    # enough to relativize; _relative_path only falls back for stragglers
+    prefix = os.path.join(str(dir_path), "")
+
+    for result in results:
+        if "pattern_matches" in result:
+            pattern_matches.extend(result["pattern_matches"])
+        if "structure" in result:
+            structure_data[_relative_path(result["file"], prefix, dir_path)] = result["structure"]
 
     # Build response
     response: dict = {
@@ -322,10 +664,7 @@ def run_analyze(
     if pattern:
         # Make paths relative
         for match in pattern_matches:
-            try:
-                match["file"] = str(Path(match["file"]).relative_to(dir_path))
-            except ValueError:
-                pass
+            match["file"] = _relative_path(match["file"], prefix, dir_path)
         response["pattern"] = pattern
         response["matches"] = pattern_matches
         response["match_count"] = len(pattern_matches)
@@ -350,7 +689,7 @@ def run_analyze(
     return response
 
 
-def main():
+def main(argv: list[str] | None = None):
     parser = argparse.ArgumentParser(
         description="Comprehensive codebase analysis"
     )
@@ -375,13 +714,19 @@ def main():
         default=1,
         help="Number of parallel workers (default: 1)",
     )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse structure results for unchanged files across runs "
+             "(stored under ~/.cache/codebase-analyzer/)",
+    )
     parser.add_argument(
         "--log",
         action="store_true",
         help="Also write output to internal/log/",
     )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # Require at least one analysis mode
     if not args.pattern and not args.structure:
@@ -393,6 +738,7 @@ def main():
             pattern=args.pattern,
             structure=args.structure,
             parallel=args.parallel,
+            cache=args.cache,
         )
 
     if result.get("status") == "error":
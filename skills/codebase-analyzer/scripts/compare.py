@@ -9,8 +9,10 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import os
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import orjson
@@ -53,16 +55,36 @@ def run_trace_for_entry(entry_path: Path) -> dict | None:
         result = subprocess.run(
             [sys.executable, str(trace_script), str(entry_path)],
             capture_output=True,
-            text=True,
             cwd=script_dir,
         )
         if result.returncode == 0:
+            # Raw bytes straight into orjson; no decode to str first
             return orjson.loads(result.stdout)
     except (subprocess.SubprocessError, orjson.JSONDecodeError):
         pass
     return None
 
 
+def _basename(path: str) -> str:
+    """Return the interned basename of a path (names repeat across edges)."""
+    return sys.intern(os.path.basename(path))
+
+
+def _graph_edges(graph: dict) -> set[tuple[str, str]]:
+    """Flatten a trace graph into (src, dep) basename edges.
+
+    Handles both v2.0 dict edges ({"to": ...}) and v1.x string edges.
+    Sources sharing a basename (e.g. two __init__.py) don't merge: the last
+    one in the graph wins.
+    """
+    by_src = {_basename(src): deps for src, deps in graph.items()}
+    return {
+        (src, _basename(dep["to"] if isinstance(dep, dict) else dep))
+        for src, deps in by_src.items()
+        for dep in deps
+    }
+
+
 def compare_traces(trace1: dict, trace2: dict) -> dict:
     """Compare two trace results.
 
@@ -78,14 +100,8 @@ def compare_traces(trace1: dict, trace2: dict) -> dict:
     files2 = set(trace2.get("files", []))
 
     # Normalize file names for comparison (just basenames)
-    def normalize(files):
-        return {Path(f).name: f for f in files}
-
-    norm1 = normalize(files1)
-    norm2 = normalize(files2)
-
-    names1 = set(norm1.keys())
-    names2 = set(norm2.keys())
+    names1 = {_basename(f) for f in files1}
+    names2 = {_basename(f) for f in files2}
 
     only_in_first = sorted(names1 - names2)
     only_in_second = sorted(names2 - names1)
@@ -95,33 +111,9 @@ def compare_traces(trace1: dict, trace2: dict) -> dict:
     graph1 = trace1.get("call_graph", trace1.get("graph", {}))
     graph2 = trace2.get("call_graph", trace2.get("graph", {}))
 
-    # Normalize graph edges by basename
-    def normalize_graph(graph):
-        normalized = {}
-        for src, deps in graph.items():
-            src_name = Path(src).name
-            dep_names = []
-            for d in deps:
-                if isinstance(d, dict):
-                    dep_names.append(Path(d["to"]).name)
-                else:
-                    dep_names.append(Path(d).name)
-            normalized[src_name] = set(dep_names)
-        return normalized
-
-    norm_graph1 = normalize_graph(graph1)
-    norm_graph2 = normalize_graph(graph2)
-
     # Find edge differences
-    all_edges1 = set()
-    for src, deps in norm_graph1.items():
-        for dep in deps:
-            all_edges1.add((src, dep))
-
-    all_edges2 = set()
-    for src, deps in norm_graph2.items():
-        for dep in deps:
-            all_edges2.add((src, dep))
+    all_edges1 = _graph_edges(graph1)
+    all_edges2 = _graph_edges(graph2)
 
     added_edges = [list(e) for e in sorted(all_edges2 - all_edges1)]
     removed_edges = [list(e) for e in sorted(all_edges1 - all_edges2)]
@@ -210,6 +202,7 @@ def run_compare(
                 error_type="invalid_args",
             )
 
+        paths = []
         for ef in entry_files:
             path = Path(ef).resolve()
             if not path.exists():
@@ -218,7 +211,13 @@ def run_compare(
                     error_type="file_not_found",
                     details={"path": str(path)},
                 )
-            trace = run_trace_for_entry(path)
+            paths.append(path)
+
+        # Each trace is a separate subprocess; run both at once
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(run_trace_for_entry, paths))
+
+        for ef, path, trace in zip(entry_files, paths, results):
             if trace is None:
                 return error_response(
                     f"Failed to trace entry file: {ef}",
@@ -246,7 +245,7 @@ def run_compare(
     }
 
 
-def main():
+def main(argv: list[str] | None = None):
     parser = argparse.ArgumentParser(
         description="Compare two import traces"
     )
@@ -267,7 +266,7 @@ def main():
         help="Also write output to internal/log/",
     )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # Validate inputs
     if args.trace_files and args.entry_files:
@@ -5,6 +5,7 @@ Usage:
     uv run scripts/find_entries.py .
     uv run scripts/find_entries.py . --types main_block,click_command,fastapi
     uv run scripts/find_entries.py /path/to/project --log
+    uv run scripts/find_entries.py . --parallel 4
 """
 
 from __future__ import annotations
@@ -12,13 +13,19 @@ from __future__ import annotations
 import argparse
 import ast
 import sys
+from collections.abc import Callable, Iterator, Set
+from functools import lru_cache, partial
+from itertools import chain, islice
 from pathlib import Path
+from typing import Any
 
 # Add parent directory to path for internal imports
 sys.path.insert(0, str(Path(__file__).parent))
 
-from internal.file_utils import find_python_files
+from internal.cache import file_key, load_cache, lookup, save_cache
+from internal.file_utils import find_python_files, iter_python_files
 from internal.output import Timer, emit, error_response, success_response
+from internal.pool import get_pool, pool_map, worth_pooling
 
 
 # Entry point detection patterns
@@ -32,6 +39,26 @@ ENTRY_TYPES = {
     "setuptools_entry": "entry_points in setup.py/pyproject.toml",
 }
 
+# Bytes that must appear in a file for each entry type to be detectable
+_SENTINELS = {
+    "main_block": b"__main__",
+    "click_command": b"click",
+    "fastapi": b"FastAPI",
+    "flask": b"Flask",
+    "typer": b"Typer",
+    "argparse": b"ArgumentParser",
+}
+
+# Python 3.13+ can constant-fold while parsing, leaving fewer nodes to walk;
+# entry point detection only looks at names, calls and line numbers
+_PARSE_FLAGS = ast.PyCF_ONLY_AST | getattr(ast, "PyCF_OPTIMIZED_AST", 0)
+
+# Files per pool task when streaming (total count isn't known up front)
+_STREAM_CHUNKSIZE = 32
+
+# Bump the version whenever scan_file's output format changes
+_ENTRIES_CACHE = "entries_v2"
+
 
 def find_main_block(tree: ast.AST) -> int | None:
     """Find 'if __name__ == "__main__"' block."""
@@ -120,7 +147,154 @@ def find_argparse_usage(tree: ast.AST) -> int | None:
     return None
 
 
-def analyze_file(filepath: Path, types_filter: set[str] | None = None) -> list[dict]:
+def _is_main_check(node: ast.If) -> bool:
+    """Check whether an If node tests __name__ == "__main__"."""
+    test = node.test
+    if not isinstance(test, ast.Compare):
+        return False
+    left = test.left
+    if not (isinstance(left, ast.Name) and left.id == "__name__"):
+        return False
+    return any(
+        isinstance(comparator, ast.Constant) and comparator.value == "__main__"
+        for comparator in test.comparators
+    )
+
+
+def _is_click_decorator(decorator: ast.expr) -> bool:
+    """Check for @click.command / @click.group, called or bare."""
+    if isinstance(decorator, ast.Call):
+        decorator = decorator.func
+    return (
+        isinstance(decorator, ast.Attribute)
+        and decorator.attr in ("command", "group")
+        and isinstance(decorator.value, ast.Name)
+        and decorator.value.id == "click"
+    )
+
+
+def _scan_entries(tree: ast.AST, types_filter: Set[str] | None = None) -> dict[str, list[int]]:
+    """Find all requested entry point types in a single walk of the tree.
+
+    Equivalent to running each find_* function, but visits every node once
+    instead of once per entry type. Results keep the find_* semantics: the
+    first match in walk order for single-occurrence types, every match for
+    click_command.
+
+    Args:
+        tree: Parsed module
+        types_filter: Set of entry types to look for (None = all)
+
+    Returns:
+        Dict of entry type -> line numbers, in ENTRY_TYPES order
+    """
+    def wanted(entry_type: str) -> bool:
+        return types_filter is None or entry_type in types_filter
+
+    want_main = wanted("main_block")
+    want_click = wanted("click_command")
+    want_fastapi = wanted("fastapi")
+    want_flask = wanted("flask")
+    want_typer = wanted("typer")
+    want_argparse = wanted("argparse")
+
+    first: dict[str, int] = {}
+    click_lines: list[int] = []
+
+    for node in ast.walk(tree):
+        if type(node) is ast.If:
+            if want_main and "main_block" not in first and _is_main_check(node):
+                first["main_block"] = node.lineno
+        elif type(node) is ast.FunctionDef:
+            if want_click:
+                for decorator in node.decorator_list:
+                    if _is_click_decorator(decorator):
+                        click_lines.append(node.lineno)
+        elif type(node) is ast.Assign:
+            value = node.value
+            if not isinstance(value, ast.Call):
+                continue
+            func = value.func
+            if isinstance(func, ast.Name):
+                name = func.id
+            elif isinstance(func, ast.Attribute):
+                name = func.attr
+                if want_typer and name == "Typer" and "typer" not in first:
+                    first["typer"] = node.lineno
+            else:
+                continue
+            if want_fastapi and name == "FastAPI" and "fastapi" not in first:
+                first["fastapi"] = node.lineno
+            elif want_flask and name == "Flask" and "flask" not in first:
+                first["flask"] = node.lineno
+        elif type(node) is ast.Call:
+            if want_argparse and "argparse" not in first:
+                func = node.func
+                if (isinstance(func, ast.Attribute) and func.attr == "ArgumentParser") or (
+                    isinstance(func, ast.Name) and func.id == "ArgumentParser"
+                ):
+                    first["argparse"] = node.lineno
+
+    found: dict[str, list[int]] = {}
+    for entry_type in ENTRY_TYPES:
+        if entry_type == "click_command":
+            if click_lines:
+                found[entry_type] = click_lines
+        elif entry_type in first:
+            found[entry_type] = [first[entry_type]]
+    return found
+
+
+@lru_cache(maxsize=None)
+def _sentinels(types_filter: frozenset[str] | None) -> tuple[bytes, ...]:
+    """Return the sentinel bytes for the requested entry types."""
+    return tuple(
+        sentinel for entry_type, sentinel in _SENTINELS.items()
+        if types_filter is None or entry_type in types_filter
+    )
+
+
+def scan_file(filepath: Path, types_filter: Set[str] | None = None) -> dict[str, list[int]]:
+    """Parse a file and find its entry point lines by type.
+
+    Args:
+        filepath: Path to the Python file
+        types_filter: Set of entry types to look for (None = all)
+
+    Returns:
+        Dict of entry type -> line numbers (empty if the file can't be parsed)
+    """
+    try:
+        content = filepath.read_bytes()
+    except (FileNotFoundError, PermissionError):
+        return {}
+
+    # Most files mention none of the entry point names; skip parsing those
+    sentinels = _sentinels(None if types_filter is None else frozenset(types_filter))
+    if not any(sentinel in content for sentinel in sentinels):
+        return {}
+
+    try:
+        tree = compile(content, str(filepath), "exec", _PARSE_FLAGS, dont_inherit=True)
+    except (SyntaxError, UnicodeDecodeError, ValueError):
+        return {}
+
+    return _scan_entries(tree, types_filter)
+
+
+def _entry_dicts(
+    filepath: Path, found: dict[str, list[int]], types_filter: Set[str] | None = None
+) -> list[dict]:
+    """Expand scan_file output into entry point dictionaries."""
+    return [
+        {"file": str(filepath), "type": entry_type, "line": line}
+        for entry_type, lines in found.items()
+        if types_filter is None or entry_type in types_filter
+        for line in lines
+    ]
+
+
+def analyze_file(filepath: Path, types_filter: Set[str] | None = None) -> list[dict]:
     """Analyze a single file for entry points.
 
     Args:
@@ -130,78 +304,122 @@ def analyze_file(filepath: Path, types_filter: set[str] | None = None) -> list[d
     Returns:
         List of entry point dictionaries
     """
-    entries = []
+    return _entry_dicts(filepath, scan_file(filepath, types_filter))
 
-    try:
-        content = filepath.read_text()
-        tree = ast.parse(content)
-    except (SyntaxError, FileNotFoundError, PermissionError, UnicodeDecodeError):
-        return []
-
-    # Check each entry type
-    if types_filter is None or "main_block" in types_filter:
-        line = find_main_block(tree)
-        if line:
-            entries.append({
-                "file": str(filepath),
-                "type": "main_block",
-                "line": line,
-            })
-
-    if types_filter is None or "click_command" in types_filter:
-        lines = find_click_commands(tree)
-        for line in lines:
-            entries.append({
-                "file": str(filepath),
-                "type": "click_command",
-                "line": line,
-            })
-
-    if types_filter is None or "fastapi" in types_filter:
-        line = find_fastapi_app(tree)
-        if line:
-            entries.append({
-                "file": str(filepath),
-                "type": "fastapi",
-                "line": line,
-            })
-
-    if types_filter is None or "flask" in types_filter:
-        line = find_flask_app(tree)
-        if line:
-            entries.append({
-                "file": str(filepath),
-                "type": "flask",
-                "line": line,
-            })
-
-    if types_filter is None or "typer" in types_filter:
-        line = find_typer_app(tree)
-        if line:
-            entries.append({
-                "file": str(filepath),
-                "type": "typer",
-                "line": line,
-            })
-
-    if types_filter is None or "argparse" in types_filter:
-        line = find_argparse_usage(tree)
-        if line:
-            entries.append({
-                "file": str(filepath),
-                "type": "argparse",
-                "line": line,
-            })
-
-    return entries
-
-
-def run_find_entries(directory: str, types: str | None = None) -> dict:
+
+def _map_files(func: Callable[[Path], Any], files: list[Path], parallel: int) -> list[Any]:
+    """Apply func to each file, in a process pool when it's worth it.
+
+    Args:
+        func: Picklable per-file function
+        files: Files to process
+        parallel: Number of parallel workers
+
+    Returns:
+        One result per file, in the order of files
+    """
+    if worth_pooling(parallel, len(files)):
+        return pool_map(func, files, parallel)
+    return [func(f) for f in files]
+
+
+def _stream_entries(
+    directory: Path, types_filter: Set[str] | None, parallel: int
+) -> tuple[list[dict], int]:
+    """Find entry points while the directory walk is still in progress.
+
+    Files go to the workers as the walk yields them rather than after a
+    full listing and sort, so parsing starts right away.
+
+    Args:
+        directory: Root directory to search
+        types_filter: Set of entry types to look for (None = all)
+        parallel: Number of parallel workers
+
+    Returns:
+        (entry point dictionaries sorted by file, number of files scanned)
+    """
+    worker = partial(analyze_file, types_filter=types_filter)
+    files = iter_python_files(directory)
+    # Peek far enough to know whether a pool is worth starting
+    head = list(islice(files, parallel * 2))
+    scanned = len(head)
+
+    def remaining() -> Iterator[Path]:
+        nonlocal scanned
+        for filepath in files:
+            scanned += 1
+            yield filepath
+
+    stream = chain(head, remaining())
+    all_entries = []
+    if worth_pooling(parallel, len(head)):
+        executor = get_pool(parallel)
+        for entries in executor.map(worker, stream, chunksize=_STREAM_CHUNKSIZE):
+            all_entries.extend(entries)
+    else:
+        for entries in map(worker, stream):
+            all_entries.extend(entries)
+
+    # Walk order is arbitrary; restore sorted-by-file order (the sort is
+    # stable, so each file's entries keep their order)
+    all_entries.sort(key=lambda entry: Path(entry["file"]))
+    return all_entries, scanned
+
+
+def _find_cached(
+    files: list[Path], root: Path, types_filter: Set[str] | None, parallel: int
+) -> list[dict]:
+    """Find entry points, reusing cached scans for unchanged files.
+
+    The cache always holds every entry type, so runs with different
+    --types share it; the filter is applied afterwards.
+
+    Args:
+        files: Files to process
+        root: Searched directory, which scopes the cache
+        types_filter: Set of entry types to report (None = all)
+        parallel: Number of parallel workers
+
+    Returns:
+        Entry point dictionaries for all files
+    """
+    cached = load_cache(_ENTRIES_CACHE, root)
+    keys = {}
+    found_by_file = {}
+    for f in files:
+        key = keys[f] = file_key(f)
+        hit, found = lookup(cached, f, key)
+        if hit:
+            found_by_file[f] = found
+
+    misses = [f for f in files if f not in found_by_file]
+    found_by_file.update(zip(misses, _map_files(scan_file, misses, parallel)))
+
+    save_cache(_ENTRIES_CACHE, root, {
+        str(f): [*keys[f], found_by_file[f]]
+        for f in files if keys[f] is not None
+    })
+
+    all_entries = []
+    for f in files:
+        all_entries.extend(_entry_dicts(f, found_by_file[f], types_filter))
+    return all_entries
+
+
+def run_find_entries(
+    directory: str,
+    types: str | None = None,
+    parallel: int = 1,
+    cache: bool = False,
+) -> dict:
     """Find entry points in a directory.
 
     Args:
         directory: Path to search
         types: Comma-separated list of entry types to find
+        parallel: Number of parallel workers
+        cache: Reuse and update on-disk results for unchanged files
 
     Returns:
         Structured result dictionary
@@ -225,7 +443,7 @@ def run_find_entries(directory: str, types: str | None = None) -> dict:
     # Parse types filter
     types_filter = None
     if types:
-        types_filter = set(t.strip() for t in types.split(","))
+        types_filter = frozenset(t.strip() for t in types.split(","))
         invalid_types = types_filter - set(ENTRY_TYPES.keys())
         if invalid_types:
             return error_response(
@@ -237,14 +455,13 @@ def run_find_entries(directory: str, types: str | None = None) -> dict:
                 },
             )
 
-    # Find all Python files
-    python_files = find_python_files(dir_path)
-
-    # Analyze each file
-    all_entries = []
-    for filepath in python_files:
-        entries = analyze_file(filepath, types_filter)
-        all_entries.extend(entries)
+    # Find and analyze Python files
+    if cache:
+        python_files = find_python_files(dir_path)
+        files_scanned = len(python_files)
+        all_entries = _find_cached(python_files, dir_path, types_filter, parallel)
+    else:
+        all_entries, files_scanned = _stream_entries(dir_path, types_filter, parallel)
 
     # Make paths relative to the search directory
     for entry in all_entries:
@@ -255,11 +472,11 @@ def run_find_entries(directory: str, types: str | None = None) -> dict:
 
     return {
         "entry_points": all_entries,
-        "files_scanned": len(python_files),
+        "files_scanned": files_scanned,
     }
 
 
-def main():
+def main(argv: list[str] | None = None):
     parser = argparse.ArgumentParser(
         description="Discover entry points in a Python codebase"
     )
@@ -273,16 +490,33 @@ def main():
         "--types",
         help=f"Comma-separated entry types: {', '.join(ENTRY_TYPES.keys())}",
     )
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=1,
+        help="Number of parallel workers (default: 1)",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse results for unchanged files across runs "
+             "(stored under ~/.cache/codebase-analyzer/)",
+    )
     parser.add_argument(
         "--log",
         action="store_true",
         help="Also write output to internal/log/",
     )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     with Timer() as timer:
-        result = run_find_entries(args.directory, types=args.types)
+        result = run_find_entries(
+            args.directory,
+            types=args.types,
+            parallel=args.parallel,
+            cache=args.cache,
+        )
 
     if result.get("status") == "error":
         emit(result, log=args.log, log_name="find_entries")
@@ -0,0 +1,111 @@
+"""Opt-in on-disk cache of per-file results, keyed by path, mtime and size."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import orjson
+
+# Cache directory, following the XDG base directory convention
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "codebase-analyzer"
+
+
+def file_key(filepath: Path) -> list[int] | None:
+    """Return the [mtime_ns, size] cache key for a file.
+
+    Args:
+        filepath: Path to the file
+
+    Returns:
+        Key list, or None if the file can't be stat'd
+    """
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def cache_file(name: str, root: Path) -> Path:
+    """Return the cache file path for a named cache over a root directory.
+
+    Args:
+        name: Cache name, including a format version (e.g. "structure_v1")
+        root: Directory the cached results belong to
+
+    Returns:
+        Path of the cache file (which may not exist yet)
+    """
+    digest = hashlib.sha1(str(root).encode()).hexdigest()[:16]
+    return CACHE_DIR / f"{name}_{digest}.json"
+
+
+def load_cache(name: str, root: Path) -> dict[str, list[Any]]:
+    """Load a cache as {path: [mtime_ns, size, value]}.
+
+    A missing or unreadable cache is treated as empty, and malformed
+    entries are dropped (so they behave as misses).
+
+    Args:
+        name: Cache name, including a format version
+        root: Directory the cached results belong to
+
+    Returns:
+        Cache entries keyed by file path
+    """
+    try:
+        data = orjson.loads(cache_file(name, root).read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {
+        path: entry for path, entry in data.items()
+        if isinstance(entry, list) and len(entry) == 3
+    }
+
+
+def lookup(entries: dict[str, list[Any]], filepath: Path | str, key: list[int] | None) -> tuple[bool, Any]:
+    """Look up a file in loaded cache entries.
+
+    Args:
+        entries: Entries from load_cache
+        filepath: Path to the file (or another string identifying the entry)
+        key: Current key, normally from file_key
+
+    Returns:
+        (hit, value) tuple; value is None on a miss
+    """
+    entry = entries.get(str(filepath))
+    if key is None or entry is None or entry[:2] != key:
+        return False, None
+    return True, entry[2]
+
+
+def save_cache(name: str, root: Path, entries: dict[str, list[Any]]) -> None:
+    """Write a cache atomically, replacing any previous version.
+
+    Failures are ignored: the cache is an optimization, never required.
+
+    Args:
+        name: Cache name, including a format version
+        root: Directory the cached results belong to
+        entries: Entries as {path: [mtime_ns, size, value]}
+    """
+    path = cache_file(name, root)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.stem, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(orjson.dumps(entries))
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    except OSError:
+        pass
@@ -2,13 +2,59 @@
 
 from __future__ import annotations
 
+import os
+from collections.abc import Iterator
+from operator import attrgetter
 from pathlib import Path
 
-EXCLUDED_DIRS = {
+EXCLUDED_DIRS = frozenset({
     ".venv", "venv", ".git", "__pycache__", "node_modules",
     ".tox", ".pytest_cache", ".mypy_cache", "dist", "build",
     ".eggs",
-}
+})
+
+
+# Sort key matching Path ordering. On POSIX, Paths compare by their parts
+# tuple, so sorting on it directly skips a Python-level __lt__ per comparison
+# (a plain string key would not do: "a-c.py" < "a/b.py" as strings). Windows
+# compares case-insensitively, so it keeps the default ordering.
+_SORT_KEY = attrgetter("parts") if os.name == "posix" else None
+
+
+def _is_excluded_dir(name: str) -> bool:
+    """Check whether a directory name should be skipped during discovery."""
+    return name in EXCLUDED_DIRS or name.endswith(".egg-info")
+
+
+def iter_python_files(directory: Path) -> Iterator[Path]:
+    """Yield Python files under directory as the walk finds them (unsorted).
+
+    Excluded directories are pruned as they're reached, so their contents
+    are never listed. Symlinked directories are not followed.
+
+    Args:
+        directory: Root directory to search
+
+    Yields:
+        Python file paths, in walk order
+    """
+    pending = [str(directory)]
+    while pending:
+        try:
+            scan = os.scandir(pending.pop())
+        except OSError:
+            continue  # Unreadable directory: skip its subtree
+        with scan:
+            for entry in scan:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                if is_dir:
+                    if not _is_excluded_dir(entry.name):
+                        pending.append(entry.path)
+                elif entry.name.endswith(".py"):
+                    yield Path(entry.path)
 
 
 def find_python_files(directory: Path) -> list[Path]:
@@ -20,13 +66,6 @@ def find_python_files(directory: Path) -> list[Path]:
     Returns:
         Sorted list of Python file paths
     """
-    python_files = []
-    for filepath in directory.rglob("*.py"):
-        parts = filepath.parts
-        if any(excluded in parts for excluded in EXCLUDED_DIRS):
-            continue
-        if any(part.endswith(".egg-info") for part in parts):
-            continue
-        python_files.append(filepath)
-
-    return sorted(python_files)
+    files = list(iter_python_files(directory))
+    files.sort(key=_SORT_KEY)
+    return files
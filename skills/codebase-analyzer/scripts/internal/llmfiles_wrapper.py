@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import subprocess
+from functools import lru_cache
 from pathlib import Path
 
 
@@ -19,29 +20,43 @@ def run_llmfiles(
     args: list[str],
     cwd: Path | None = None,
     capture_output: bool = True,
-) -> subprocess.CompletedProcess[str]:
+    discard_stdout: bool = False,
+) -> subprocess.CompletedProcess[bytes]:
     """Run llmfiles CLI and return the result.
 
+    Output is returned undecoded; callers that want text decode it
+    themselves (llmfiles output can be large and is often not needed).
+
     Args:
         args: Arguments to pass to llmfiles (e.g., ["main.py", "--deps"])
         cwd: Working directory for the command
         capture_output: Whether to capture stdout/stderr
+        discard_stdout: Send stdout to /dev/null instead of buffering it
+            (for callers that only need the exit status and stderr)
 
     Returns:
-        CompletedProcess with stdout, stderr, and returncode
+        CompletedProcess with stdout and stderr as bytes, and returncode
 
     Raises:
-        LlmfilesError: If llmfiles returns non-zero exit code
+        LlmfilesError: If llmfiles returns non-zero exit code (with stderr
+            decoded to text)
     """
     cmd = ["llmfiles"] + args
 
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=capture_output,
-            text=True,
-            cwd=cwd,
-        )
+        if discard_stdout:
+            result = subprocess.run(
+                cmd,
+                cwd=cwd,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+            )
+        else:
+            result = subprocess.run(
+                cmd,
+                cwd=cwd,
+                capture_output=capture_output,
+            )
     except FileNotFoundError:
         raise LlmfilesError(
             "llmfiles not found. Install with: uv add llmfiles",
@@ -52,14 +67,15 @@ def run_llmfiles(
         raise LlmfilesError(
             f"llmfiles failed with exit code {result.returncode}",
             returncode=result.returncode,
-            stderr=result.stderr,
+            stderr=result.stderr.decode("utf-8", errors="replace") if result.stderr else "",
         )
 
     return result
 
 
+@lru_cache(maxsize=1)
 def get_llmfiles_version() -> str | None:
-    """Get the installed llmfiles version."""
+    """Get the installed llmfiles version (probed once per process)."""
     try:
         result = subprocess.run(
             ["llmfiles", "--version"],
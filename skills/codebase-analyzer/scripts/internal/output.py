@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
+import os
+import sys
 import time
-from datetime import datetime
-from pathlib import Path
+from pathlib import Path, PurePath
 from typing import Any
 
 import orjson
@@ -12,6 +13,20 @@ import orjson
 # Log directory relative to this file
 LOG_DIR = Path(__file__).parent / "log"
 
+_DUMPS_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> str:
+    """Serialize paths as strings; anything else orjson can't handle is an error."""
+    if isinstance(obj, PurePath):
+        return os.fspath(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps(data: dict[str, Any]) -> bytes:
+    """Serialize data to indented JSON bytes, with Paths as strings."""
+    return orjson.dumps(data, default=_default, option=_DUMPS_OPTIONS)
+
 
 def emit(data: dict[str, Any], log: bool = False, log_name: str = "operation") -> None:
     """Emit JSON to stdout, optionally log to file.
@@ -21,11 +36,27 @@ def emit(data: dict[str, Any], log: bool = False, log_name: str = "operation") -
         log: Whether to also write to log file
         log_name: Prefix for the log filename
     """
-    output = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
-    print(output)
+    output = _dumps(data)
+    _write_stdout(output + b"\n")
 
     if log:
-        write_log(data, log_name)
+        # Same bytes as stdout; no second serialization pass
+        write_log_bytes(output, log_name)
+
+
+def _write_stdout(payload: bytes) -> None:
+    """Write already-encoded bytes to stdout, skipping a decode/re-encode.
+
+    Falls back to text writes when stdout has no binary buffer (e.g. some
+    embedded or replaced streams).
+    """
+    buffer = getattr(sys.stdout, "buffer", None)
+    if buffer is None:
+        sys.stdout.write(payload.decode())
+        return
+    sys.stdout.flush()  # Keep ordering with any earlier text writes
+    buffer.write(payload)
+    buffer.flush()
 
 
 def write_log(data: dict[str, Any], log_name: str = "operation") -> Path:
@@ -35,16 +66,30 @@ def write_log(data: dict[str, Any], log_name: str = "operation") -> Path:
         data: Dictionary to log
         log_name: Prefix for the log filename
 
+    Returns:
+        Path to the created log file
+    """
+    payload = _dumps(data)
+    return write_log_bytes(payload, log_name)
+
+
+def write_log_bytes(payload: bytes, log_name: str = "operation") -> Path:
+    """Write already-serialized JSON to internal/log/ with timestamp.
+
+    Args:
+        payload: Serialized JSON
+        log_name: Prefix for the log filename
+
     Returns:
         Path to the created log file
     """
     LOG_DIR.mkdir(parents=True, exist_ok=True)
 
-    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    timestamp = time.strftime("%Y-%m-%d_%H-%M-%S")
     log_file = LOG_DIR / f"{log_name}_{timestamp}.json"
 
     with open(log_file, "wb") as f:
-        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        f.write(payload)
 
     return log_file
 
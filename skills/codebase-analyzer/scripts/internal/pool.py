@@ -0,0 +1,75 @@
+"""Shared process pool for the per-file workers in analyze.py and find_entries.py."""
+
+from __future__ import annotations
+
+import ast
+import atexit
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+# Worker pool kept alive across calls in the same process (see get_pool)
+_POOL: ProcessPoolExecutor | None = None
+_POOL_SIZE = 0
+
+
+def _init_worker() -> None:
+    """Warm a fresh pool worker before it takes real files.
+
+    Matters on spawn-based platforms (macOS, Windows), where each worker
+    starts a new interpreter; forked workers already share the parent's state.
+    """
+    ast.parse("pass")
+
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    """Return the shared worker pool, (re)creating it if the size changed.
+
+    Reusing one pool means repeated runs from the same process only pay
+    worker startup once. A pool broken by a dying worker (OOM, a crash in a
+    C extension) is replaced rather than failing every later call.
+    """
+    global _POOL, _POOL_SIZE
+    if _POOL is None or _POOL_SIZE != workers or _POOL._broken:
+        if _POOL is not None:
+            _POOL.shutdown()
+        _POOL = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        _POOL_SIZE = workers
+    return _POOL
+
+
+def shutdown_pool() -> None:
+    """Shut down the shared worker pool, if one was started."""
+    global _POOL
+    if _POOL is not None:
+        _POOL.shutdown()
+        _POOL = None
+
+
+atexit.register(shutdown_pool)
+
+
+def worth_pooling(parallel: int, count: int) -> bool:
+    """Check whether count files are enough to keep parallel workers busy.
+
+    With fewer, the process overhead outweighs the gain.
+    """
+    return parallel > 1 and count >= parallel * 2
+
+
+def pool_map(func: Callable[[Path], Any], files: list[Path], parallel: int) -> list[Any]:
+    """Map func over files in the shared pool.
+
+    Dispatch is batched so tiny files don't pay per-file IPC.
+
+    Args:
+        func: Picklable per-file function
+        files: Files to process
+        parallel: Number of parallel workers
+
+    Returns:
+        One result per file, in the order of files
+    """
+    chunksize = max(1, len(files) // (parallel * 4))
+    return list(get_pool(parallel).map(func, files, chunksize=chunksize))
@@ -10,18 +10,28 @@ Usage:
     uv run scripts/trace.py main.py --grep PAT   # Find files by content, then trace
     uv run scripts/trace.py main.py --since DATE # Only recently changed files
     uv run scripts/trace.py main.py --log        # Also write to internal/log/
+    uv run scripts/trace.py main.py --cache      # Reuse result if no .py file changed
 """
 
 from __future__ import annotations
 
 import argparse
+import hashlib
+import heapq
+import os
 import sys
-from collections import defaultdict
+from collections import defaultdict, deque
+from collections.abc import Callable
+from functools import lru_cache
+from importlib import metadata
+from itertools import islice
 from pathlib import Path
 
 # Add parent directory to path for internal imports
 sys.path.insert(0, str(Path(__file__).parent))
 
+from internal.cache import file_key, load_cache, lookup, save_cache
+from internal.file_utils import iter_python_files
 from internal.output import Timer, emit, error_response, success_response
 
 # Try importing llmfiles library directly; track availability
@@ -41,6 +51,12 @@ try:
 except ImportError:
     pass
 
+# Bump the version whenever the trace output format changes
+_TRACE_CACHE = "trace_v1"
+
+# Files or directories marking a project root
+_ROOT_MARKERS = frozenset({"pyproject.toml", "setup.py", "setup.cfg", ".git"})
+
 
 def compute_hub_scores(call_graph: dict[Path, set[Path]]) -> list[dict]:
     """Compute hub scores for files based on in-degree + out-degree.
@@ -51,56 +67,244 @@ def compute_hub_scores(call_graph: dict[Path, set[Path]]) -> list[dict]:
     Returns:
         Top 5 hub modules sorted by score, as list of dicts
     """
-    out_degree: dict[Path, int] = {}
-    in_degree: dict[Path, int] = defaultdict(int)
+    nodes, _, adjacency = _index_graph(call_graph)
+    return _hub_scores(nodes, adjacency)
 
-    for src, deps in call_graph.items():
-        out_degree[src] = len(deps)
+
+def _hub_scores(nodes: list[Path], adjacency: list[list[int]], top: int = 5) -> list[dict]:
+    """Hub scores over an indexed graph (see compute_hub_scores)."""
+    in_degree = [0] * len(nodes)
+    for deps in adjacency:
         for dep in deps:
             in_degree[dep] += 1
 
-    all_files = set(out_degree.keys()) | set(in_degree.keys())
-    scores = []
-    for f in all_files:
-        od = out_degree.get(f, 0)
-        ind = in_degree.get(f, 0)
-        scores.append({"file": f, "in_degree": ind, "out_degree": od, "score": ind + od})
+    scores = [ind + len(deps) for ind, deps in zip(in_degree, adjacency)]
+    # nlargest matches a stable descending sort, without sorting every file
+    best = heapq.nlargest(top, range(len(nodes)), key=scores.__getitem__)
+    return [
+        {"file": nodes[i], "in_degree": in_degree[i], "out_degree": len(adjacency[i]), "score": scores[i]}
+        for i in best
+    ]
+
+
+def _index_graph(
+    call_graph: dict[Path, set[Path]],
+) -> tuple[list[Path], dict[Path, int], list[list[int]]]:
+    """Relabel the call graph with dense integer node IDs.
+
+    Args:
+        call_graph: Dict mapping file -> set of imported files
 
-    scores.sort(key=lambda x: x["score"], reverse=True)
-    return scores[:5]
+    Returns:
+        (nodes, id_of, adjacency): nodes[i] is the file for ID i, id_of its
+        inverse, adjacency[i] the IDs it imports. Files that appear only as
+        imports get IDs too.
+    """
+    id_of: dict[Path, int] = {}
+    for src in call_graph:
+        id_of[src] = len(id_of)
+    for deps in call_graph.values():
+        for dep in deps:
+            if dep not in id_of:
+                id_of[dep] = len(id_of)
+
+    adjacency: list[list[int]] = [[] for _ in id_of]
+    for src, deps in call_graph.items():
+        adjacency[id_of[src]] = [id_of[dep] for dep in deps]
+    return list(id_of), id_of, adjacency
 
 
-def detect_cycles(call_graph: dict[Path, set[Path]]) -> list[list[str]]:
+def detect_cycles(call_graph: dict[Path, set[Path]], limit: int = 10) -> list[list[str]]:
     """Detect circular dependencies in the call graph.
 
+    Finds strongly connected components with an iterative Tarjan pass
+    (linear in graph size, no recursion) and reports one cycle through each
+    component that has one.
+
+    Args:
+        call_graph: Dict mapping file -> set of imported files
+        limit: Maximum number of cycles to report
+
+    Returns:
+        List of cycles, each cycle is a list of file path strings starting
+        and ending with the same file
+    """
+    nodes, _, adjacency = _index_graph(call_graph)
+    return [[str(nodes[i]) for i in cycle] for cycle in _find_cycles(adjacency, limit)]
+
+
+def _find_cycles(adjacency: list[list[int]], limit: int) -> list[list[int]]:
+    """Tarjan's SCC algorithm over an integer adjacency list.
+
+    Args:
+        adjacency: adjacency[i] lists the node IDs that node i points to
+        limit: Stop after this many cycles
+
+    Returns:
+        One cycle per non-trivial SCC (or self-loop), as [v, ..., v] ID lists
+    """
+    n = len(adjacency)
+    index = [-1] * n
+    lowlink = [0] * n
+    on_stack = bytearray(n)
+    stack: list[int] = []
+    cycles: list[list[int]] = []
+    counter = 0
+
+    for root in range(n):
+        if index[root] != -1:
+            continue
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        work = [(root, iter(adjacency[root]))]
+
+        while work:
+            node, neighbors = work[-1]
+            for neighbor in neighbors:
+                if index[neighbor] == -1:
+                    index[neighbor] = lowlink[neighbor] = counter
+                    counter += 1
+                    stack.append(neighbor)
+                    on_stack[neighbor] = 1
+                    work.append((neighbor, iter(adjacency[neighbor])))
+                    break
+                if on_stack[neighbor] and index[neighbor] < lowlink[node]:
+                    lowlink[node] = index[neighbor]
+            else:
+                # All neighbors done: propagate lowlink, close the SCC if node is its root
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if lowlink[node] < lowlink[parent]:
+                        lowlink[parent] = lowlink[node]
+                if lowlink[node] != index[node]:
+                    continue
+                component = set()
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = 0
+                    component.add(member)
+                    if member == node:
+                        break
+                cycle = _cycle_in_component(adjacency, node, component)
+                if cycle:
+                    cycles.append(cycle)
+                    if len(cycles) >= limit:
+                        return cycles
+
+    return cycles
+
+
+def _cycle_in_component(
+    adjacency: list[list[int]], start: int, component: set[int]
+) -> list[int] | None:
+    """Find a shortest cycle through start that stays within its SCC.
+
+    Args:
+        adjacency: adjacency[i] lists the node IDs that node i points to
+        start: Node to start and end the cycle at
+        component: Strongly connected component containing start
+
+    Returns:
+        Cycle as [start, ..., start], or None for a single node without a self-loop
+    """
+    deps = adjacency[start]
+    if start in deps:
+        return [start, start]
+    if len(component) == 1:
+        return None
+
+    # BFS back to start; every member of a non-trivial SCC reaches it
+    came_from: dict[int, int] = {}
+    queue = deque(dep for dep in deps if dep in component)
+    for dep in queue:
+        came_from[dep] = start
+    while queue:
+        current = queue.popleft()
+        for dep in adjacency[current]:
+            if dep == start:
+                path = [current]
+                while path[-1] != start:
+                    path.append(came_from[path[-1]])
+                path.reverse()
+                return path + [start]
+            if dep in component and dep not in came_from:
+                came_from[dep] = current
+                queue.append(dep)
+    return None
+
+
+def _max_depth(adjacency: list[list[int]], start: int) -> int:
+    """Compute the longest shortest-path distance from start (BFS depth).
+
+    Args:
+        adjacency: adjacency[i] lists the node IDs that node i points to
+        start: Node ID to start from
+
+    Returns:
+        Maximum BFS depth reached from start (0 if it imports nothing)
+    """
+    max_depth = 0
+    # Mark nodes when enqueued, so each is queued once at its shortest depth
+    bfs_visited = bytearray(len(adjacency))
+    bfs_visited[start] = 1
+    queue = deque([(start, 0)])
+    while queue:
+        current, depth = queue.popleft()
+        if depth > max_depth:
+            max_depth = depth
+        for dep in adjacency[current]:
+            if not bfs_visited[dep]:
+                bfs_visited[dep] = 1
+                queue.append((dep, depth + 1))
+    return max_depth
+
+
+def analyze_graph(
+    call_graph: dict[Path, set[Path]], entry: Path
+) -> tuple[list[dict], list[list[str]], int]:
+    """Compute hub scores, cycles and max depth from one indexed graph.
+
+    Equivalent to calling compute_hub_scores and detect_cycles plus a BFS
+    for depth, but the Path-keyed graph is relabelled to integer IDs once
+    and shared by all three.
+
     Args:
         call_graph: Dict mapping file -> set of imported files
+        entry: File to measure depth from
 
     Returns:
-        List of cycles, each cycle is a list of file path strings
+        (hubs, cycles, max_depth) tuple
     """
-    cycles = []
-    visited = set()
-
-    def dfs(node: Path, path: list[Path], on_stack: set[Path]):
-        if node in on_stack:
-            cycle_start = path.index(node)
-            cycle = [str(p) for p in path[cycle_start:]] + [str(node)]
-            cycles.append(cycle)
-            return
-        if node in visited:
-            return
-        visited.add(node)
-        on_stack.add(node)
-        path.append(node)
-        for neighbor in call_graph.get(node, set()):
-            dfs(neighbor, path.copy(), on_stack.copy())
-
-    for start in call_graph:
-        if start not in visited:
-            dfs(start, [], set())
-
-    return cycles[:10]
+    nodes, id_of, adjacency = _index_graph(call_graph)
+    hubs = _hub_scores(nodes, adjacency)
+    cycles = [[str(nodes[i]) for i in cycle] for cycle in _find_cycles(adjacency, 10)]
+    max_depth = _max_depth(adjacency, id_of[entry]) if entry in id_of else 0
+    return hubs, cycles, max_depth
+
+
+def find_project_root(entry_path: Path) -> Path:
+    """Walk up from the entry file to the project root.
+
+    Looks for pyproject.toml, setup.py, setup.cfg or .git up to 10 levels up.
+
+    Args:
+        entry_path: Resolved path to the entry file
+
+    Returns:
+        Project root, or the entry file's directory if no marker is found
+    """
+    # One directory listing per level instead of a stat per marker
+    for candidate in islice(entry_path.parents, 10):
+        try:
+            names = os.listdir(candidate)
+        except OSError:
+            continue
+        if not _ROOT_MARKERS.isdisjoint(names):
+            return candidate
+    return entry_path.parent
 
 
 def trace_with_library(
@@ -120,18 +324,7 @@ def trace_with_library(
     Returns:
         Structured result dictionary
     """
-    project_root = entry_path.parent
-
-    # Walk up to find the project root (look for pyproject.toml, setup.py, .git)
-    candidate = entry_path.parent
-    for _ in range(10):
-        if any((candidate / marker).exists() for marker in ("pyproject.toml", "setup.py", "setup.cfg", ".git")):
-            project_root = candidate
-            break
-        parent = candidate.parent
-        if parent == candidate:
-            break
-        candidate = parent
+    project_root = find_project_root(entry_path)
 
     # Initialize CallTracer
     tracer = CallTracer(
@@ -186,126 +379,74 @@ def trace_with_library(
     if git_modified is not None:
         all_files = [f for f in all_files if f in git_modified]
 
+    # Files recur across many edges; relativize each path only once
+    rel = _make_relativizer(project_root)
+
     # Build relative file paths
-    rel_files = []
-    for f in all_files:
-        try:
-            rel_files.append(str(f.relative_to(project_root)))
-        except ValueError:
-            rel_files.append(str(f))
+    rel_files = [rel(f) for f in all_files]
 
-    # Build enriched call_graph with per-edge line numbers
+    # One pass over the discovered calls builds the enriched call_graph (with
+    # per-edge line numbers) and classifies external dependencies; sets
+    # dedupe (package, importing file) pairs as they're added
     call_graph_output: dict[str, list[dict]] = defaultdict(list)
-    for call_info in tracer.discovered_calls:
-        try:
-            from_rel = str(call_info.from_file.relative_to(project_root))
-        except ValueError:
-            from_rel = str(call_info.from_file)
-        try:
-            to_rel = str(call_info.to_file.relative_to(project_root))
-        except ValueError:
-            to_rel = str(call_info.to_file)
+    external: dict[str, set[str]] = {}
+    stdlib_modules = sys.stdlib_module_names
+    internal_files = tracer.visited_files
 
+    for call_info in tracer.discovered_calls:
+        # Each attribute is read once; to_file and from_name are reused below
+        to_file = call_info.to_file
+        module = call_info.from_name
+        from_rel = rel(call_info.from_file)
         call_graph_output[from_rel].append({
-            "to": to_rel,
-            "module": call_info.from_name,
+            "to": rel(to_file),
+            "module": module,
             "line": call_info.from_line,
         })
 
-    # Classify external dependencies using resolve_import
-    external: dict[str, list[str]] = defaultdict(list)
-    stdlib_modules = sys.stdlib_module_names
-
-    # Collect all unique top-level module names from imports that weren't resolved to project files
-    seen_ext = set()
-    for call_info in tracer.discovered_calls:
-        top_module = call_info.from_name.split(".")[0]
-        if top_module in stdlib_modules:
+        # Imports that weren't resolved to project files are external
+        # candidates (most edges are internal; check that first)
+        if to_file in internal_files:
             continue
-        # If the target file is in the project, it's internal
-        if call_info.to_file in tracer.visited_files:
+        top_module = module.partition(".")[0]
+        if top_module in stdlib_modules:
             continue
-        key = (top_module, str(call_info.from_file))
-        if key not in seen_ext:
-            seen_ext.add(key)
-            try:
-                from_rel = str(call_info.from_file.relative_to(project_root))
-            except ValueError:
-                from_rel = str(call_info.from_file)
-            external[top_module].append(from_rel)
+        external.setdefault(top_module, set()).add(from_rel)
 
     # Also check skipped imports for external deps
     for file_path, module_name, _line in tracer.skipped_imports:
-        top_module = module_name.split(".")[0]
+        top_module = module_name.partition(".")[0]
         if top_module in stdlib_modules:
             continue
-        try:
-            from_rel = str(file_path.relative_to(project_root))
-        except ValueError:
-            from_rel = str(file_path)
-        key = (top_module, from_rel)
-        if key not in seen_ext:
-            seen_ext.add(key)
-            external[top_module].append(from_rel)
-
-    # Compute hub scores
-    hubs = compute_hub_scores(tracer.call_graph)
+        external.setdefault(top_module, set()).add(rel(file_path))
+
+    # Hub scores, circular dependencies and max depth share one graph pass
+    hubs, circular, max_depth = analyze_graph(tracer.call_graph, entry_path.resolve())
     hub_output = []
     for h in hubs:
-        try:
-            hub_file = str(h["file"].relative_to(project_root))
-        except (ValueError, AttributeError):
-            hub_file = str(h["file"])
         hub_output.append({
-            "file": hub_file,
+            "file": rel(h["file"]),
             "in_degree": h["in_degree"],
             "out_degree": h["out_degree"],
             "score": h["score"],
         })
 
-    # Detect circular dependencies
-    circular = detect_cycles(tracer.call_graph)
     # Make paths relative in cycle output
     circular_rel = []
     for cycle in circular:
-        rel_cycle = []
-        for p in cycle:
-            try:
-                rel_cycle.append(str(Path(p).relative_to(project_root)))
-            except ValueError:
-                rel_cycle.append(p)
-        circular_rel.append(rel_cycle)
-
-    # Compute max depth via BFS from entry
-    max_depth = 0
-    if entry_path.resolve() in tracer.call_graph or entry_path in tracer.visited_files:
-        bfs_visited = set()
-        queue = [(entry_path.resolve(), 0)]
-        while queue:
-            current, depth = queue.pop(0)
-            if current in bfs_visited:
-                continue
-            bfs_visited.add(current)
-            max_depth = max(max_depth, depth)
-            for dep in tracer.call_graph.get(current, set()):
-                if dep not in bfs_visited:
-                    queue.append((dep, depth + 1))
+        circular_rel.append([rel(Path(p)) for p in cycle])
 
     # Build parse error output
     parse_errors = []
     for file_path, error_msg in tracer.parse_errors:
-        try:
-            pe_rel = str(file_path.relative_to(project_root))
-        except ValueError:
-            pe_rel = str(file_path)
-        parse_errors.append({"file": pe_rel, "error": error_msg})
+        parse_errors.append({"file": rel(file_path), "error": error_msg})
 
     result = {
-        "entry": str(entry_path.relative_to(project_root)) if _is_subpath(entry_path, project_root) else str(entry_path),
+        "entry": rel(entry_path),
         "project_root": str(project_root),
         "files": rel_files,
         "call_graph": dict(call_graph_output),
-        "external": {pkg: sorted(set(files)) for pkg, files in external.items()},
+        "external": {pkg: sorted(files) for pkg, files in external.items()},
         "stats": {
             "total_files": len(rel_files),
             "max_depth": max_depth,
@@ -327,13 +468,24 @@ def trace_with_library(
     return result
 
 
-def _is_subpath(path: Path, parent: Path) -> bool:
-    """Check if path is under parent directory."""
-    try:
-        path.relative_to(parent)
-        return True
-    except ValueError:
-        return False
+def _make_relativizer(root: Path) -> Callable[[Path], str]:
+    """Return a memoized function rendering paths relative to root.
+
+    Paths outside root are rendered as-is.
+    """
+    cache: dict[Path, str] = {}
+
+    def rel(path: Path) -> str:
+        result = cache.get(path)
+        if result is None:
+            try:
+                result = str(path.relative_to(root))
+            except ValueError:
+                result = str(path)
+            cache[path] = result
+        return result
+
+    return rel
 
 
 def trace_with_subprocess(entry_path: Path, trace_all: bool = False) -> dict:
@@ -355,7 +507,8 @@ def trace_with_subprocess(entry_path: Path, trace_all: bool = False) -> dict:
         llmfiles_args.append("--all")
 
     try:
-        run_llmfiles(llmfiles_args, cwd=entry_path.parent)
+        # Output isn't parsed here, so don't hold a potentially large dump in memory
+        run_llmfiles(llmfiles_args, cwd=entry_path.parent, discard_stdout=True)
     except LlmfilesError as e:
         return error_response(
             str(e),
@@ -382,11 +535,80 @@ def trace_with_subprocess(entry_path: Path, trace_all: bool = False) -> dict:
     }
 
 
+@lru_cache(maxsize=1)
+def _llmfiles_version() -> str:
+    """Installed llmfiles library version (empty if unknown), read once."""
+    try:
+        return metadata.version("llmfiles")
+    except metadata.PackageNotFoundError:
+        return ""
+
+
+def _project_signature(project_root: Path) -> list[int]:
+    """Fingerprint everything a cached trace result depends on.
+
+    Covers the project's Python files and root config files (by path,
+    mtime and size) and the installed llmfiles version.
+
+    Args:
+        project_root: Project root directory
+
+    Returns:
+        [digest, file count] cache key; changes when any file is added,
+        removed or modified, or llmfiles is upgraded
+    """
+    digest = hashlib.sha1(f"llmfiles {_llmfiles_version()}\n".encode())
+    # Root config files steer root detection and import resolution (setup.py
+    # is covered with the other .py files below)
+    for name in sorted(_ROOT_MARKERS - {".git", "setup.py"}):
+        digest.update(f"{name}\0{file_key(project_root / name)}\n".encode())
+    count = 0
+    for filepath in sorted(iter_python_files(project_root)):
+        key = file_key(filepath)
+        if key is None:
+            continue
+        digest.update(f"{filepath}\0{key[0]}\0{key[1]}\n".encode())
+        count += 1
+    return [int.from_bytes(digest.digest()[:8], "big"), count]
+
+
+def _cached_trace(entry_path: Path, trace_all: bool, grep_pattern: str | None) -> dict:
+    """Run trace_with_library, reusing the last result if nothing it depends on changed.
+
+    Args:
+        entry_path: Resolved path to the entry file
+        trace_all: If True, trace all imports without smart filtering
+        grep_pattern: If set, find files containing pattern and use as seeds
+
+    Returns:
+        Structured result dictionary
+    """
+    project_root = find_project_root(entry_path)
+    signature = _project_signature(project_root)
+    cache_key = f"{entry_path}\0{int(trace_all)}\0{grep_pattern or ''}"
+
+    # Entries from an older project state can never hit again
+    entries = {
+        key: entry for key, entry in load_cache(_TRACE_CACHE, project_root).items()
+        if entry[:2] == signature
+    }
+    hit, result = lookup(entries, cache_key, signature)
+    if hit:
+        return result
+
+    result = trace_with_library(entry_path, trace_all=trace_all, grep_pattern=grep_pattern)
+    if result.get("status") != "error":
+        entries[cache_key] = [*signature, result]
+        save_cache(_TRACE_CACHE, project_root, entries)
+    return result
+
+
 def run_trace(
     entry: str,
     trace_all: bool = False,
     grep_pattern: str | None = None,
     since: str | None = None,
+    cache: bool = False,
 ) -> dict:
     """Run import trace on an entry file.
 
@@ -395,6 +617,8 @@ def run_trace(
         trace_all: If True, trace all imports without filtering
         grep_pattern: If set, find files containing pattern and use as seeds
         since: If set, only include files modified since this git date
+        cache: Reuse the previous result while no project .py file has
+            changed (ignored with since, which depends on the current time)
 
     Returns:
         Structured result dictionary
@@ -416,6 +640,8 @@ def run_trace(
         )
 
     if _LLMFILES_AVAILABLE:
+        if cache and not since:
+            return _cached_trace(entry_path, trace_all, grep_pattern)
         return trace_with_library(entry_path, trace_all=trace_all, grep_pattern=grep_pattern, since=since)
     else:
         if grep_pattern or since:
@@ -427,7 +653,7 @@ def run_trace(
         return trace_with_subprocess(entry_path, trace_all=trace_all)
 
 
-def main():
+def main(argv: list[str] | None = None):
     parser = argparse.ArgumentParser(
         description="Import tracing with structured JSON output"
     )
@@ -447,13 +673,20 @@ def main():
         "--since",
         help="Only include files modified since date (e.g. '7 days ago')",
     )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse the last result while no project .py file, root config file "
+             "or llmfiles version has changed "
+             "(stored under ~/.cache/codebase-analyzer/; not used with --since)",
+    )
     parser.add_argument(
         "--log",
         action="store_true",
         help="Also write output to internal/log/",
     )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     with Timer() as timer:
         result = run_trace(
@@ -461,6 +694,7 @@ def main():
             trace_all=args.trace_all,
             grep_pattern=args.grep_pattern,
             since=args.since,
+            cache=args.cache,
         )
 
     if result.get("status") == "error":
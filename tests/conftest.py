@@ -0,0 +1,92 @@
+"""Shared pytest fixtures."""
+
+import contextlib
+import importlib
+import io
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Make the scripts importable once for every test module
+SCRIPTS_DIR = Path(__file__).parent.parent / "skills" / "codebase-analyzer" / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "sample_project"
+
+from internal.file_utils import find_python_files
+
+# Files in the shared sample tree; those under excluded dirs must never be found
+SAMPLE_TREE_FILES = (
+    "a.py",
+    "m.py",
+    "z.py",
+    "top.py",
+    "real.py",
+    "src.py",
+    "c.txt",
+    "pkg/sub/deep.py",
+    ".venv/lib/module.py",
+    ".git/hooks/pre-commit.py",
+    "__pycache__/cache_x.py",
+    "pkg/mypackage.egg-info/PKG-INFO.py",
+)
+
+
+@pytest.fixture(scope="session")
+def sample_tree(tmp_path_factory) -> tuple[Path, list[Path]]:
+    """Build one project tree per session and discover it once.
+
+    Returns:
+        (root, find_python_files(root)) tuple
+    """
+    root = tmp_path_factory.mktemp("py_tree")
+    for rel in SAMPLE_TREE_FILES:
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("x = 1\n")
+    return root, find_python_files(root)
+
+
+def call_main(script_name: str, *args: str) -> subprocess.CompletedProcess:
+    """Run a script's main(argv) in-process, returning what subprocess.run would.
+
+    stdout and stderr are captured as bytes (emit() writes straight to the
+    binary buffer), and a sys.exit() code becomes returncode.
+    """
+    module = importlib.import_module(Path(script_name).stem)
+    out, err = io.BytesIO(), io.BytesIO()
+    stdout = io.TextIOWrapper(out, encoding="utf-8", write_through=True)
+    stderr = io.TextIOWrapper(err, encoding="utf-8", write_through=True)
+    returncode = 0
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            module.main(list(args))
+        except SystemExit as e:
+            returncode = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    return subprocess.CompletedProcess([script_name, *args], returncode, out.getvalue(), err.getvalue())
+
+
+@pytest.fixture
+def run_main():
+    """Run a script's main(argv) in-process; see call_main."""
+    return call_main
+
+
+@pytest.fixture(scope="session")
+def traced_main() -> subprocess.CompletedProcess:
+    """trace.py run once on the sample project's main.py, shared by read-only tests."""
+    return call_main("trace.py", str(FIXTURES_DIR / "main.py"))
+
+
+@pytest.fixture(scope="session")
+def analyzed_structure() -> subprocess.CompletedProcess:
+    """analyze.py --structure run once on the sample project, shared by read-only tests."""
+    return call_main("analyze.py", str(FIXTURES_DIR), "--structure")
+
+
+@pytest.fixture(scope="session")
+def fixture_entries() -> subprocess.CompletedProcess:
+    """find_entries.py run once on the sample project, shared by read-only tests."""
+    return call_main("find_entries.py", str(FIXTURES_DIR))
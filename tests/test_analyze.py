@@ -1,50 +1,34 @@
 """Tests for analyze.py script."""
 
-import json
-import subprocess
-import sys
 from pathlib import Path
 
+import orjson
 import pytest
 
 # Paths
 TESTS_DIR = Path(__file__).parent
-PROJECT_ROOT = TESTS_DIR.parent
-SCRIPTS_DIR = PROJECT_ROOT / "skills" / "codebase-analyzer" / "scripts"
 FIXTURES_DIR = TESTS_DIR / "fixtures" / "sample_project"
 
 
-def run_script(script_name: str, *args: str, cwd: Path | None = None) -> subprocess.CompletedProcess:
-    """Run a script and return the result."""
-    script_path = SCRIPTS_DIR / script_name
-    cmd = [sys.executable, str(script_path)] + list(args)
-    return subprocess.run(
-        cmd,
-        capture_output=True,
-        text=True,
-        cwd=cwd or SCRIPTS_DIR,
-    )
-
-
 class TestAnalyzeBasic:
     """Basic analyze.py tests."""
 
-    def test_analyze_structure(self):
+    def test_analyze_structure(self, analyzed_structure):
         """Test structure analysis."""
-        result = run_script("analyze.py", str(FIXTURES_DIR), "--structure")
+        result = analyzed_structure
         assert result.returncode == 0
 
-        data = json.loads(result.stdout)
+        data = orjson.loads(result.stdout)
         assert data["status"] == "success"
         assert "files_analyzed" in data
         assert "structure" in data
 
-    def test_analyze_nonexistent_directory(self):
+    def test_analyze_nonexistent_directory(self, run_main):
         """Test with non-existent directory."""
-        result = run_script("analyze.py", "/nonexistent/directory", "--structure")
+        result = run_main("analyze.py", "/nonexistent/directory", "--structure")
         assert result.returncode == 1
 
-        data = json.loads(result.stdout)
+        data = orjson.loads(result.stdout)
         assert data["status"] == "error"
         assert data["error_type"] == "directory_not_found"
 
@@ -52,12 +36,12 @@ class TestAnalyzeBasic:
 class TestAnalyzePattern:
     """Test analyze.py pattern searching."""
 
-    def test_pattern_search_class(self):
+    def test_pattern_search_class(self, run_main):
         """Test searching for class names."""
-        result = run_script("analyze.py", str(FIXTURES_DIR), "--pattern", "Engine")
+        result = run_main("analyze.py", str(FIXTURES_DIR), "--pattern", "Engine")
         assert result.returncode == 0
 
-        data = json.loads(result.stdout)
+        data = orjson.loads(result.stdout)
         assert "matches" in data
         assert data["match_count"] > 0
 
@@ -66,12 +50,12 @@ class TestAnalyzePattern:
         engine_matches = [m for m in matches if m["name"] == "Engine"]
         assert len(engine_matches) > 0
 
-    def test_pattern_search_function(self):
+    def test_pattern_search_function(self, run_main):
         """Test searching for function names."""
-        result = run_script("analyze.py", str(FIXTURES_DIR), "--pattern", "validate")
+        result = run_main("analyze.py", str(FIXTURES_DIR), "--pattern", "validate")
         assert result.returncode == 0
 
-        data = json.loads(result.stdout)
+        data = orjson.loads(result.stdout)
         assert "matches" in data
 
         # Should find validate_input function
@@ -79,12 +63,12 @@ class TestAnalyzePattern:
         validate_matches = [m for m in matches if "validate" in m["name"].lower()]
         assert len(validate_matches) > 0
 
-    def test_pattern_no_matches(self):
+    def test_pattern_no_matches(self, run_main):
         """Test pattern that doesn't match anything."""
-        result = run_script("analyze.py", str(FIXTURES_DIR), "--pattern", "NonExistentXYZ")
+        result = run_main("analyze.py", str(FIXTURES_DIR), "--pattern", "NonExistentXYZ")
         assert result.returncode == 0
 
-        data = json.loads(result.stdout)
+        data = orjson.loads(result.stdout)
         assert data["match_count"] == 0
         assert data["matches"] == []
 
@@ -92,12 +76,12 @@ class TestAnalyzePattern:
 class TestAnalyzeStructure:
     """Test analyze.py structure extraction."""
 
-    def test_extract_classes(self):
+    def test_extract_classes(self, analyzed_structure):
         """Test extracting class information."""
-        result = run_script("analyze.py", str(FIXTURES_DIR), "--structure")
+        result = analyzed_structure
         assert result.returncode == 0
 
-        data = json.loads(result.stdout)
+        data = orjson.loads(result.stdout)
         structure = data["structure"]
 
         # Find engine.py structure
@@ -117,12 +101,12 @@ class TestAnalyzeStructure:
         assert "methods" in engine_class
         assert "process" in engine_class["methods"]
 
-    def test_extract_functions(self):
+    def test_extract_functions(self, analyzed_structure):
         """Test extracting function information."""
-        result = run_script("analyze.py", str(FIXTURES_DIR), "--structure")
+        result = analyzed_structure
         assert result.returncode == 0
 
-        data = json.loads(result.stdout)
+        data = orjson.loads(result.stdout)
         structure = data["structure"]
 
         # Find helpers.py structure
@@ -145,12 +129,12 @@ class TestAnalyzeStructure:
 class TestAnalyzeStats:
     """Test analyze.py statistics."""
 
-    def test_stats_present(self):
+    def test_stats_present(self, analyzed_structure):
         """Test that stats are included in output."""
-        result = run_script("analyze.py", str(FIXTURES_DIR), "--structure")
+        result = analyzed_structure
         assert result.returncode == 0
 
-        data = json.loads(result.stdout)
+        data = orjson.loads(result.stdout)
         assert "stats" in data
 
         stats = data["stats"]
@@ -1,19 +1,32 @@
-"""Tests for compare.py script."""
+"""Tests for compare.py script.
+
+Comparison logic is exercised in-process; a single subprocess test covers
+the CLI wiring (argv parsing, JSON on stdout, exit code).
+"""
 
-import json
 import subprocess
 import sys
-import tempfile
 from pathlib import Path
 
+import orjson
 import pytest
 
+# Scripts are importable via the sys.path entry added once in conftest.py
+from compare import compare_traces
+
 # Paths
 TESTS_DIR = Path(__file__).parent
 PROJECT_ROOT = TESTS_DIR.parent
 SCRIPTS_DIR = PROJECT_ROOT / "skills" / "codebase-analyzer" / "scripts"
 FIXTURES_DIR = TESTS_DIR / "fixtures" / "sample_project"
 
+# Output contract of compare_traces: required keys, top level and nested
+COMPARISON_KEYS = frozenset({
+    "only_in_first", "only_in_second", "common",
+    "graph_diff", "external_diff", "summary", "stats",
+})
+GRAPH_DIFF_KEYS = frozenset({"added_edges", "removed_edges"})
+
 
 def run_script(script_name: str, *args: str, cwd: Path | None = None) -> subprocess.CompletedProcess:
     """Run a script and return the result."""
@@ -22,7 +35,6 @@ def run_script(script_name: str, *args: str, cwd: Path | None = None) -> subproc
     return subprocess.run(
         cmd,
         capture_output=True,
-        text=True,
         cwd=cwd or SCRIPTS_DIR,
     )
 
@@ -30,64 +42,58 @@ def run_script(script_name: str, *args: str, cwd: Path | None = None) -> subproc
 def create_trace_file(content: dict, directory: Path) -> Path:
     """Create a temporary trace JSON file."""
     trace_file = directory / "trace.json"
-    with open(trace_file, "w") as f:
-        json.dump(content, f)
+    trace_file.write_bytes(orjson.dumps(content))
     return trace_file
 
 
 class TestCompareBasic:
     """Basic compare.py tests."""
 
-    def test_compare_two_trace_files(self):
-        """Test comparing two trace JSON files."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            tmppath = Path(tmpdir)
-
-            trace1 = {
-                "status": "success",
-                "entry": "main.py",
-                "files": ["main.py", "utils.py", "old_module.py"],
-                "graph": {"main.py": ["utils.py"]},
-                "external": ["requests"],
-            }
-            trace2 = {
-                "status": "success",
-                "entry": "main.py",
-                "files": ["main.py", "utils.py", "new_module.py"],
-                "graph": {"main.py": ["utils.py", "new_module.py"]},
-                "external": ["requests", "httpx"],
-            }
-
-            # Create directories first
-            (tmppath / "a").mkdir()
-            (tmppath / "b").mkdir()
-            file1 = create_trace_file(trace1, tmppath / "a")
-            file2 = create_trace_file(trace2, tmppath / "b")
-
-            result = run_script("compare.py", str(file1), str(file2))
-            assert result.returncode == 0
-
-            data = json.loads(result.stdout)
-            assert data["status"] == "success"
-            assert "only_in_first" in data
-            assert "only_in_second" in data
-            assert "common" in data
-
-    def test_compare_missing_file(self):
+    def test_cli_smoke(self, tmp_path):
+        """Test comparing two trace JSON files through the CLI."""
+        trace1 = {
+            "status": "success",
+            "entry": "main.py",
+            "files": ["main.py", "utils.py", "old_module.py"],
+            "graph": {"main.py": ["utils.py"]},
+            "external": ["requests"],
+        }
+        trace2 = {
+            "status": "success",
+            "entry": "main.py",
+            "files": ["main.py", "utils.py", "new_module.py"],
+            "graph": {"main.py": ["utils.py", "new_module.py"]},
+            "external": ["requests", "httpx"],
+        }
+
+        # Create directories first
+        (tmp_path / "a").mkdir()
+        (tmp_path / "b").mkdir()
+        file1 = create_trace_file(trace1, tmp_path / "a")
+        file2 = create_trace_file(trace2, tmp_path / "b")
+
+        result = run_script("compare.py", str(file1), str(file2))
+        assert result.returncode == 0
+
+        data = orjson.loads(result.stdout)
+        assert data["status"] == "success"
+        assert COMPARISON_KEYS - data.keys() == set()
+
+    def test_compare_missing_file(self, run_main):
         """Test with missing trace file."""
-        result = run_script("compare.py", "/nonexistent/trace1.json", "/nonexistent/trace2.json")
+        result = run_main("compare.py", "/nonexistent/trace1.json", "/nonexistent/trace2.json")
         assert result.returncode == 1
 
-        data = json.loads(result.stdout)
+        data = orjson.loads(result.stdout)
         assert data["status"] == "error"
         assert data["error_type"] == "file_not_found"
 
-    def test_compare_no_arguments(self):
+    def test_compare_no_arguments(self, run_main):
         """Test with no arguments."""
-        result = run_script("compare.py")
+        result = run_main("compare.py")
         assert result.returncode == 1
 
-        data = json.loads(result.stdout)
+        data = orjson.loads(result.stdout)
         assert data["status"] == "error"
         assert data["error_type"] == "invalid_args"
 
@@ -97,68 +103,54 @@ class TestCompareOutput:
 
     def test_comparison_structure(self):
         """Test that comparison output has expected structure."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            tmppath = Path(tmpdir)
-            (tmppath / "a").mkdir()
-            (tmppath / "b").mkdir()
-
-            trace1 = {
-                "files": ["main.py", "shared.py"],
-                "graph": {},
-                "external": ["numpy"],
-            }
-            trace2 = {
-                "files": ["main.py", "shared.py", "extra.py"],
-                "graph": {},
-                "external": ["numpy", "pandas"],
-            }
-
-            file1 = create_trace_file(trace1, tmppath / "a")
-            file2 = create_trace_file(trace2, tmppath / "b")
-
-            result = run_script("compare.py", str(file1), str(file2))
-            assert result.returncode == 0
-
-            data = json.loads(result.stdout)
-
-            # Check required fields
-            assert "only_in_first" in data
-            assert "only_in_second" in data
-            assert "common" in data
-            assert "graph_diff" in data
-            assert "external_diff" in data
-            assert "summary" in data
-            assert "stats" in data
+        trace1 = {
+            "files": ["main.py", "shared.py"],
+            "graph": {},
+            "external": ["numpy"],
+        }
+        trace2 = {
+            "files": ["main.py", "shared.py", "extra.py"],
+            "graph": {},
+            "external": ["numpy", "pandas"],
+        }
+
+        data = compare_traces(trace1, trace2)
+
+        # Check required fields; a failure lists every missing key
+        assert COMPARISON_KEYS - data.keys() == set()
 
     def test_graph_diff_structure(self):
         """Test graph diff output."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            tmppath = Path(tmpdir)
-            (tmppath / "a").mkdir()
-            (tmppath / "b").mkdir()
-
-            trace1 = {
-                "files": ["a.py", "b.py"],
-                "graph": {"a.py": ["b.py"]},
-                "external": [],
-            }
-            trace2 = {
-                "files": ["a.py", "b.py", "c.py"],
-                "graph": {"a.py": ["b.py", "c.py"]},
-                "external": [],
-            }
-
-            file1 = create_trace_file(trace1, tmppath / "a")
-            file2 = create_trace_file(trace2, tmppath / "b")
-
-            result = run_script("compare.py", str(file1), str(file2))
-            assert result.returncode == 0
-
-            data = json.loads(result.stdout)
-            graph_diff = data["graph_diff"]
-
-            assert "added_edges" in graph_diff
-            assert "removed_edges" in graph_diff
+        trace1 = {
+            "files": ["a.py", "b.py"],
+            "graph": {"a.py": ["b.py"]},
+            "external": [],
+        }
+        trace2 = {
+            "files": ["a.py", "b.py", "c.py"],
+            "graph": {"a.py": ["b.py", "c.py"]},
+            "external": [],
+        }
+
+        graph_diff = compare_traces(trace1, trace2)["graph_diff"]
+
+        assert GRAPH_DIFF_KEYS - graph_diff.keys() == set()
+
+    def test_same_named_sources_last_wins(self):
+        """Sources sharing a basename aren't merged; the last one's edges count."""
+        trace1 = {"files": [], "graph": {}, "external": []}
+        trace2 = {
+            "files": [],
+            "graph": {
+                "pkg_a/__init__.py": ["pkg_a/x.py"],
+                "pkg_b/__init__.py": ["pkg_b/y.py"],
+            },
+            "external": [],
+        }
+
+        graph_diff = compare_traces(trace1, trace2)["graph_diff"]
+
+        assert graph_diff["added_edges"] == [["__init__.py", "y.py"]]
 
 
 class TestCompareStats:
@@ -166,33 +158,21 @@ class TestCompareStats:
 
     def test_stats_accuracy(self):
         """Test that statistics are accurate."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            tmppath = Path(tmpdir)
-            (tmppath / "a").mkdir()
-            (tmppath / "b").mkdir()
-
-            trace1 = {
-                "files": ["a.py", "b.py", "c.py"],
-                "graph": {},
-                "external": [],
-            }
-            trace2 = {
-                "files": ["b.py", "c.py", "d.py", "e.py"],
-                "graph": {},
-                "external": [],
-            }
-
-            file1 = create_trace_file(trace1, tmppath / "a")
-            file2 = create_trace_file(trace2, tmppath / "b")
-
-            result = run_script("compare.py", str(file1), str(file2))
-            assert result.returncode == 0
-
-            data = json.loads(result.stdout)
-            stats = data["stats"]
-
-            assert stats["files_in_first"] == 3
-            assert stats["files_in_second"] == 4
-            assert stats["common_files"] == 2  # b.py, c.py
-            assert stats["unique_to_first"] == 1  # a.py
-            assert stats["unique_to_second"] == 2  # d.py, e.py
+        trace1 = {
+            "files": ["a.py", "b.py", "c.py"],
+            "graph": {},
+            "external": [],
+        }
+        trace2 = {
+            "files": ["b.py", "c.py", "d.py", "e.py"],
+            "graph": {},
+            "external": [],
+        }
+
+        stats = compare_traces(trace1, trace2)["stats"]
+
+        assert stats["files_in_first"] == 3
+        assert stats["files_in_second"] == 4
+        assert stats["common_files"] == 2  # b.py, c.py
+        assert stats["unique_to_first"] == 1  # a.py
+        assert stats["unique_to_second"] == 2  # d.py, e.py
@@ -4,21 +4,62 @@ Tests the actual Python functions directly rather than running scripts via subpr
 """
 
 import ast
+import os
+import pickle
+import shutil
+import signal
 import sys
 import tempfile
+import time
 from pathlib import Path
+from types import SimpleNamespace
 from collections import defaultdict
 
+import orjson
 import pytest
 
-# Add scripts to path for direct imports
-TESTS_DIR = Path(__file__).parent
-PROJECT_ROOT = TESTS_DIR.parent
-SCRIPTS_DIR = PROJECT_ROOT / "skills" / "codebase-analyzer" / "scripts"
-sys.path.insert(0, str(SCRIPTS_DIR))
-
-from internal.file_utils import find_python_files
-from internal.output import Timer, error_response, success_response
+# Scripts are importable via the sys.path entry added once in conftest.py
+import analyze
+import compare
+import find_entries
+import internal.cache
+import internal.output
+import internal.pool
+import trace
+from analyze import (
+    _dotted,
+    _may_contain,
+    _read_ahead,
+    _relative_path,
+    compile_pattern,
+    extract_structure,
+    search_pattern,
+)
+from compare import compare_traces
+from find_entries import (
+    _scan_entries,
+    find_argparse_usage,
+    find_click_commands,
+    find_fastapi_app,
+    find_flask_app,
+    find_main_block,
+    find_typer_app,
+    run_find_entries,
+)
+from internal.file_utils import find_python_files, iter_python_files
+from internal.llmfiles_wrapper import LlmfilesError, get_llmfiles_version, run_llmfiles
+from internal.output import Timer, emit, error_response, success_response
+from trace import (
+    _make_relativizer,
+    analyze_graph,
+    compute_hub_scores,
+    detect_cycles,
+    find_project_root,
+    run_trace,
+)
+
+# Probed once per session: run_trace can only succeed through one of these
+HAS_LLMFILES = trace._LLMFILES_AVAILABLE or shutil.which("llmfiles") is not None
 
 
 # --- file_utils tests ---
@@ -26,91 +67,113 @@ from internal.output import Timer, error_response, success_response
 class TestFindPythonFiles:
     """Tests for shared find_python_files."""
 
-    def test_finds_python_files(self, tmp_path):
+    def test_finds_python_files(self, sample_tree):
         """Should find .py files in directory."""
-        (tmp_path / "a.py").write_text("x = 1")
-        (tmp_path / "b.py").write_text("y = 2")
-        (tmp_path / "c.txt").write_text("not python")
-
-        files = find_python_files(tmp_path)
+        _, files = sample_tree
         names = [f.name for f in files]
         assert "a.py" in names
-        assert "b.py" in names
+        assert "m.py" in names
         assert "c.txt" not in names
 
-    def test_excludes_venv(self, tmp_path):
-        """Should skip .venv directories."""
-        venv_dir = tmp_path / ".venv" / "lib"
-        venv_dir.mkdir(parents=True)
-        (venv_dir / "module.py").write_text("x = 1")
-        (tmp_path / "real.py").write_text("y = 2")
-
-        files = find_python_files(tmp_path)
-        names = [f.name for f in files]
-        assert "real.py" in names
-        assert "module.py" not in names
-
-    def test_excludes_git(self, tmp_path):
-        """Should skip .git directories."""
-        git_dir = tmp_path / ".git" / "hooks"
-        git_dir.mkdir(parents=True)
-        (git_dir / "pre-commit.py").write_text("x = 1")
-        (tmp_path / "src.py").write_text("y = 2")
-
-        files = find_python_files(tmp_path)
-        names = [f.name for f in files]
-        assert "src.py" in names
-        assert "pre-commit.py" not in names
-
-    def test_excludes_pycache(self, tmp_path):
-        """Should skip __pycache__ directories."""
-        cache_dir = tmp_path / "__pycache__"
-        cache_dir.mkdir()
-        (cache_dir / "module.cpython-311.pyc.py").write_text("x = 1")
-        (tmp_path / "src.py").write_text("y = 2")
-
-        files = find_python_files(tmp_path)
-        names = [f.name for f in files]
-        assert "src.py" in names
-        assert len(files) == 1
-
-    def test_excludes_egg_info(self, tmp_path):
-        """Should skip .egg-info directories."""
-        egg_dir = tmp_path / "mypackage.egg-info"
-        egg_dir.mkdir()
-        (egg_dir / "PKG-INFO.py").write_text("x = 1")
-        (tmp_path / "src.py").write_text("y = 2")
-
-        files = find_python_files(tmp_path)
+    @pytest.mark.parametrize("expected_name,forbidden_name", [
+        ("real.py", "module.py"),       # .venv
+        ("src.py", "pre-commit.py"),    # .git
+        ("src.py", "cache_x.py"),       # __pycache__
+        ("src.py", "PKG-INFO.py"),      # *.egg-info
+    ])
+    def test_excludes_dirs(self, sample_tree, expected_name, forbidden_name):
+        """Should skip excluded directories; all rules share one walk."""
+        _, files = sample_tree
         names = [f.name for f in files]
-        assert "src.py" in names
-        assert len(files) == 1
+        assert expected_name in names
+        assert forbidden_name not in names
 
     def test_empty_directory(self, tmp_path):
         """Should return empty list for empty directory."""
         files = find_python_files(tmp_path)
         assert files == []
 
-    def test_recursive(self, tmp_path):
+    def test_recursive(self, sample_tree):
         """Should find files in subdirectories."""
-        sub = tmp_path / "pkg" / "sub"
-        sub.mkdir(parents=True)
-        (sub / "deep.py").write_text("x = 1")
-        (tmp_path / "top.py").write_text("y = 2")
-
-        files = find_python_files(tmp_path)
+        _, files = sample_tree
         names = [f.name for f in files]
         assert "top.py" in names
         assert "deep.py" in names
 
-    def test_sorted_output(self, tmp_path):
+    def test_sorted_output(self, sample_tree):
         """Should return sorted list."""
-        (tmp_path / "z.py").write_text("x = 1")
-        (tmp_path / "a.py").write_text("y = 2")
-        (tmp_path / "m.py").write_text("z = 3")
+        _, files = sample_tree
+        assert files == sorted(files)
+
+    def test_sorted_like_paths(self, tmp_path):
+        """Directory contents sort before sibling names that extend the dir name."""
+        (tmp_path / "a").mkdir()
+        (tmp_path / "a" / "b.py").write_text("x = 1")
+        (tmp_path / "a-c.py").write_text("y = 2")
 
         files = find_python_files(tmp_path)
         assert files == sorted(files)
+        assert [f.name for f in files] == ["b.py", "a-c.py"]
+
+    def test_exact_file_set(self, sample_tree):
+        """Only the seven non-excluded .py files are found."""
+        root, files = sample_tree
+        assert [f.relative_to(root).as_posix() for f in files] == [
+            "a.py", "m.py", "pkg/sub/deep.py", "real.py", "src.py", "top.py", "z.py",
+        ]
+
+    def test_root_inside_excluded_name(self, tmp_path):
+        """Exclusions apply below the root, not to the root's own path."""
+        root = tmp_path / "build" / "project"
+        root.mkdir(parents=True)
+        (root / "app.py").write_text("x = 1")
+
+        files = find_python_files(root)
+        assert [f.name for f in files] == ["app.py"]
+
+    def test_iter_matches_find(self, sample_tree):
+        """iter_python_files yields the same files, just unsorted."""
+        root, files = sample_tree
+        assert sorted(iter_python_files(root)) == files
+
+
+# --- llmfiles_wrapper tests ---
+
+@pytest.mark.skipif(sys.platform == "win32", reason="stand-in llmfiles is a shell script")
+class TestRunLlmfiles:
+    """Tests for run_llmfiles, using a stand-in llmfiles executable."""
+
+    @pytest.fixture(autouse=True)
+    def _fake_llmfiles(self, tmp_path, monkeypatch):
+        script = tmp_path / "llmfiles"
+        script.write_text('#!/bin/sh\necho traced\necho warn >&2\n[ "$1" = fail ] && exit 3\nexit 0\n')
+        script.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ.get('PATH', '')}")
+
+    def test_captures_output(self):
+        result = run_llmfiles(["main.py"])
+        assert result.stdout == b"traced\n"
+        assert result.stderr == b"warn\n"
+
+    def test_discard_stdout(self):
+        result = run_llmfiles(["main.py"], discard_stdout=True)
+        assert result.stdout is None
+        assert result.stderr == b"warn\n"
+
+    def test_failure_decodes_stderr(self):
+        with pytest.raises(LlmfilesError) as exc_info:
+            run_llmfiles(["fail"], discard_stdout=True)
+        assert exc_info.value.returncode == 3
+        assert exc_info.value.stderr == "warn\n"
+
+    def test_version_probed_once(self, tmp_path):
+        get_llmfiles_version.cache_clear()
+        try:
+            assert get_llmfiles_version() == "traced"
+            (tmp_path / "llmfiles").unlink()
+            assert get_llmfiles_version() == "traced"
+        finally:
+            get_llmfiles_version.cache_clear()
 
 
 # --- output.py tests ---
@@ -154,14 +217,46 @@ class TestSuccessResponse:
         assert "duration_ms" not in result
 
 
+class TestEmit:
+    """Tests for emit."""
+
+    def test_writes_indented_json_line(self, capsys):
+        emit({"status": "success", "files": ["a.py"]})
+        out = capsys.readouterr().out
+        assert out.endswith("}\n")
+        assert orjson.loads(out) == {"status": "success", "files": ["a.py"]}
+
+    def test_preserves_order_with_print(self, capsys):
+        print("before")
+        emit({"x": 1})
+        assert capsys.readouterr().out.startswith("before\n{")
+
+    def test_log_matches_stdout(self, capsys, tmp_path, monkeypatch):
+        monkeypatch.setattr(internal.output, "LOG_DIR", tmp_path)
+        internal.output.emit({"x": [1, 2]}, log=True, log_name="test")
+        (log_file,) = tmp_path.glob("test_*.json")
+        assert log_file.read_text() + "\n" == capsys.readouterr().out
+
+    def test_paths_serialized_as_strings(self, capsys):
+        emit({"file": Path("pkg") / "mod.py"})
+        assert orjson.loads(capsys.readouterr().out) == {"file": str(Path("pkg") / "mod.py")}
+
+    def test_unserializable_value_raises(self, capsys):
+        with pytest.raises(TypeError):
+            emit({"names": {"a"}})
+        assert capsys.readouterr().out == ""
+
+
 class TestTimer:
     """Tests for Timer context manager."""
 
-    def test_timer_measures_time(self):
-        import time
+    def test_timer_measures_time(self, monkeypatch):
+        # Controlled clock: no real sleep, exact arithmetic
+        clock = SimpleNamespace(perf_counter=iter([2.0, 2.25]).__next__)
+        monkeypatch.setattr(internal.output, "time", clock)
         with Timer() as t:
-            time.sleep(0.01)
-        assert t.elapsed_ms >= 10
+            pass
+        assert t.elapsed_ms == 250
 
     def test_timer_zero_for_fast_ops(self):
         with Timer() as t:
@@ -174,9 +269,7 @@ class TestTimer:
 class TestComputeHubScores:
     """Tests for compute_hub_scores."""
 
-    def setup_method(self):
-        from trace import compute_hub_scores
-        self.compute = compute_hub_scores
+    compute = staticmethod(compute_hub_scores)
 
     def test_empty_graph(self):
         scores = self.compute({})
@@ -214,9 +307,7 @@ class TestComputeHubScores:
 class TestDetectCycles:
     """Tests for detect_cycles."""
 
-    def setup_method(self):
-        from trace import detect_cycles
-        self.detect = detect_cycles
+    detect = staticmethod(detect_cycles)
 
     def test_no_cycles(self):
         graph = {Path("a.py"): {Path("b.py")}, Path("b.py"): {Path("c.py")}}
@@ -252,13 +343,151 @@ class TestDetectCycles:
         cycles = self.detect(graph)
         assert len(cycles) <= 10
 
+    def test_cycle_is_closed_path(self):
+        graph = {
+            Path("a.py"): {Path("b.py")},
+            Path("b.py"): {Path("c.py")},
+            Path("c.py"): {Path("a.py"), Path("d.py")},
+        }
+        cycles = self.detect(graph)
+        assert len(cycles) == 1
+        cycle = cycles[0]
+        assert cycle[0] == cycle[-1]
+        assert sorted(cycle[:-1]) == ["a.py", "b.py", "c.py"]
+        for src, dst in zip(cycle, cycle[1:]):
+            assert Path(dst) in graph[Path(src)]
+
+    def test_one_cycle_per_component(self):
+        """Overlapping cycles in one strongly connected component are reported once."""
+        graph = {
+            Path("a.py"): {Path("b.py"), Path("c.py")},
+            Path("b.py"): {Path("a.py")},
+            Path("c.py"): {Path("a.py")},
+        }
+        assert len(self.detect(graph)) == 1
+
+    def test_deep_chain_does_not_recurse(self):
+        """Import chains deeper than the recursion limit are handled."""
+        depth = sys.getrecursionlimit() * 2
+        graph = {Path(f"m{i}.py"): {Path(f"m{i + 1}.py")} for i in range(depth)}
+        assert self.detect(graph) == []
+
+    def test_deep_ring(self):
+        depth = sys.getrecursionlimit() * 2
+        graph = {Path(f"m{i}.py"): {Path(f"m{(i + 1) % depth}.py")} for i in range(depth)}
+        (cycle,) = self.detect(graph)
+        assert len(cycle) == depth + 1
+        assert cycle[0] == cycle[-1]
+
+
+class TestMaxDepth:
+    """Tests for the max depth reported by analyze_graph."""
+
+    @staticmethod
+    def depth(graph, entry):
+        return analyze_graph(graph, entry)[2]
+
+    def test_isolated_entry(self):
+        assert self.depth({}, Path("a.py")) == 0
+
+    def test_chain(self):
+        graph = {Path("a.py"): {Path("b.py")}, Path("b.py"): {Path("c.py")}}
+        assert self.depth(graph, Path("a.py")) == 2
+
+    def test_shortest_path_wins(self):
+        """A node reachable by a short and a long path counts at its BFS depth."""
+        graph = {
+            Path("a.py"): {Path("b.py"), Path("d.py")},
+            Path("b.py"): {Path("c.py")},
+            Path("c.py"): {Path("d.py")},
+        }
+        assert self.depth(graph, Path("a.py")) == 2
+
+    def test_cycle_terminates(self):
+        graph = {Path("a.py"): {Path("b.py")}, Path("b.py"): {Path("a.py")}}
+        assert self.depth(graph, Path("a.py")) == 1
+
+
+class TestAnalyzeGraph:
+    """Tests for analyze_graph."""
+
+    def test_matches_separate_passes(self):
+        graph = {
+            Path("main.py"): {Path("a.py"), Path("b.py")},
+            Path("a.py"): {Path("b.py"), Path("c.py")},
+            Path("b.py"): {Path("a.py")},
+            Path("c.py"): {Path("d.py")},
+        }
+        hubs, cycles, depth = trace.analyze_graph(graph, Path("main.py"))
+        assert [h["score"] for h in hubs] == [h["score"] for h in trace.compute_hub_scores(graph)]
+        assert cycles == trace.detect_cycles(graph)
+        assert depth == 3
+
+    def test_entry_not_in_graph(self):
+        _, _, depth = analyze_graph({Path("a.py"): {Path("b.py")}}, Path("main.py"))
+        assert depth == 0
+
+
+class TestTraceCache:
+    """Tests for run_trace's opt-in result cache (library path stubbed out)."""
+
+    @pytest.fixture(autouse=True)
+    def _setup(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(internal.cache, "CACHE_DIR", tmp_path / "cache")
+        monkeypatch.setattr(trace, "_LLMFILES_AVAILABLE", True)
+        self.calls = []
+
+        def fake_trace(entry_path, **kwargs):
+            self.calls.append(kwargs)
+            return {"entry": entry_path.name, "files": [entry_path.name]}
+
+        monkeypatch.setattr(trace, "trace_with_library", fake_trace)
+        self.project = tmp_path / "proj"
+        self.project.mkdir()
+        (self.project / "pyproject.toml").write_text("")
+        self.entry = self.project / "main.py"
+        self.entry.write_text("import helper\n")
+        (self.project / "helper.py").write_text("x = 1\n")
+
+    def test_unchanged_project_hits(self):
+        first = trace.run_trace(str(self.entry), cache=True)
+        second = trace.run_trace(str(self.entry), cache=True)
+        assert first == second
+        assert len(self.calls) == 1
+
+    def test_modified_file_misses(self):
+        trace.run_trace(str(self.entry), cache=True)
+        (self.project / "helper.py").write_text("x = 2  # changed size\n")
+        trace.run_trace(str(self.entry), cache=True)
+        assert len(self.calls) == 2
+
+    def test_modified_pyproject_misses(self):
+        trace.run_trace(str(self.entry), cache=True)
+        (self.project / "pyproject.toml").write_text("[project]\nname = 'proj'\n")
+        trace.run_trace(str(self.entry), cache=True)
+        assert len(self.calls) == 2
+
+    def test_llmfiles_upgrade_misses(self, monkeypatch):
+        trace.run_trace(str(self.entry), cache=True)
+        monkeypatch.setattr(trace, "_llmfiles_version", lambda: "99.0")
+        trace.run_trace(str(self.entry), cache=True)
+        assert len(self.calls) == 2
+
+    def test_options_are_part_of_key(self):
+        trace.run_trace(str(self.entry), cache=True)
+        trace.run_trace(str(self.entry), trace_all=True, cache=True)
+        assert len(self.calls) == 2
+
+    def test_since_bypasses_cache(self):
+        trace.run_trace(str(self.entry), since="1 day ago", cache=True)
+        trace.run_trace(str(self.entry), since="1 day ago", cache=True)
+        assert len(self.calls) == 2
+
 
 class TestRunTrace:
     """Tests for run_trace error handling."""
 
-    def setup_method(self):
-        from trace import run_trace
-        self.run = run_trace
+    run = staticmethod(run_trace)
 
     def test_nonexistent_file(self):
         result = self.run("/nonexistent/path/file.py")
@@ -272,6 +501,7 @@ class TestRunTrace:
         assert result["status"] == "error"
         assert result["error_type"] == "invalid_file_type"
 
+    @pytest.mark.skipif(not HAS_LLMFILES, reason="needs the llmfiles library or CLI")
     def test_valid_python_file(self, tmp_path):
         f = tmp_path / "test.py"
         f.write_text("import os\nx = 1\n")
@@ -280,116 +510,259 @@ class TestRunTrace:
         assert "status" not in result or result.get("status") != "error"
 
 
-class TestIsSubpath:
-    """Tests for _is_subpath helper."""
+class TestMakeRelativizer:
+    """Tests for _make_relativizer."""
+
+    @pytest.fixture
+    def rel(self):
+        # A fresh relativizer per test, so each starts with an empty memo
+        return _make_relativizer(Path("/project"))
+
+    def test_inside_root(self, rel):
+        assert rel(Path("/project/pkg/mod.py")) == str(Path("pkg/mod.py"))
+
+    def test_outside_root(self, rel):
+        assert rel(Path("/other/mod.py")) == str(Path("/other/mod.py"))
 
-    def setup_method(self):
-        from trace import _is_subpath
-        self.check = _is_subpath
+    def test_repeated_lookup(self, rel):
+        path = Path("/project/a.py")
+        assert rel(path) == rel(path) == "a.py"
 
-    def test_child_path(self):
-        assert self.check(Path("/a/b/c"), Path("/a/b"))
 
-    def test_same_path(self):
-        assert self.check(Path("/a/b"), Path("/a/b"))
+class TestFindProjectRoot:
+    """Tests for find_project_root."""
 
-    def test_unrelated_path(self):
-        assert not self.check(Path("/x/y"), Path("/a/b"))
+    def test_nearest_marker_wins(self, tmp_path):
+        (tmp_path / ".git").mkdir()
+        (tmp_path / "pkg").mkdir()
+        (tmp_path / "pkg" / "setup.cfg").write_text("")
+        (tmp_path / "pkg" / "sub").mkdir()
+        entry = tmp_path / "pkg" / "sub" / "main.py"
+        assert find_project_root(entry) == tmp_path / "pkg"
 
-    def test_parent_of_child(self):
-        assert not self.check(Path("/a"), Path("/a/b"))
+    def test_no_marker_within_limit(self, tmp_path):
+        (tmp_path / "pyproject.toml").write_text("")
+        deep = tmp_path.joinpath(*"abcdefghijk")
+        assert find_project_root(deep / "main.py") == deep
 
 
 # --- find_entries.py core function tests ---
 
+# Parsed once at import and shared by the entry-point detector tests
+MAIN_TREE = ast.parse('if __name__ == "__main__":\n    main()\n')
+MAIN_LINE2_TREE = ast.parse('x = 1\nif __name__ == "__main__":\n    main()\n')
+CLICK_TREE = ast.parse("import click\n@click.command()\ndef cli(): pass\n")
+FASTAPI_TREE = ast.parse("from fastapi import FastAPI\napp = FastAPI()\n")
+NEG_TREE = ast.parse("def foo(): pass\n")
+
+
 class TestFindMainBlock:
     """Tests for find_main_block."""
 
-    def setup_method(self):
-        from find_entries import find_main_block
-        self.find = find_main_block
+    find = staticmethod(find_main_block)
 
     def test_detects_main_block(self):
-        code = 'if __name__ == "__main__":\n    main()\n'
-        tree = ast.parse(code)
-        assert self.find(tree) is not None
+        assert self.find(MAIN_TREE) is not None
 
     def test_no_main_block(self):
-        code = "def foo(): pass\n"
-        tree = ast.parse(code)
-        assert self.find(tree) is None
+        assert self.find(NEG_TREE) is None
 
     def test_returns_line_number(self):
-        code = 'x = 1\nif __name__ == "__main__":\n    main()\n'
-        tree = ast.parse(code)
-        assert self.find(tree) == 2
+        assert self.find(MAIN_LINE2_TREE) == 2
 
 
 class TestFindClickCommands:
     """Tests for find_click_commands."""
 
-    def setup_method(self):
-        from find_entries import find_click_commands
-        self.find = find_click_commands
+    find = staticmethod(find_click_commands)
 
     def test_detects_click_command(self):
-        code = "import click\n@click.command()\ndef cli(): pass\n"
-        tree = ast.parse(code)
-        lines = self.find(tree)
+        lines = self.find(CLICK_TREE)
         assert len(lines) > 0
 
     def test_no_click(self):
-        code = "def foo(): pass\n"
-        tree = ast.parse(code)
-        assert self.find(tree) == []
+        assert self.find(NEG_TREE) == []
 
 
 class TestFindFastapiApp:
     """Tests for find_fastapi_app."""
 
-    def setup_method(self):
-        from find_entries import find_fastapi_app
-        self.find = find_fastapi_app
+    find = staticmethod(find_fastapi_app)
 
     def test_detects_fastapi(self):
-        code = "from fastapi import FastAPI\napp = FastAPI()\n"
-        tree = ast.parse(code)
-        assert self.find(tree) is not None
+        assert self.find(FASTAPI_TREE) is not None
 
     def test_no_fastapi(self):
-        code = "x = 1\n"
-        tree = ast.parse(code)
-        assert self.find(tree) is None
+        assert self.find(NEG_TREE) is None
+
+
+# One snippet per entry type, with the single-purpose finder it must agree with
+ENTRY_SNIPPETS = {
+    "main_block": (find_main_block, 'x = 1\nif __name__ == "__main__":\n    main()\n'),
+    "click_command": (
+        find_click_commands,
+        "import click\n@click.command()\ndef cli(): pass\n@click.group\ndef grp(): pass\n",
+    ),
+    "fastapi": (find_fastapi_app, "import fastapi\napp = fastapi.FastAPI()\n"),
+    "flask": (find_flask_app, "from flask import Flask\napp = Flask(__name__)\n"),
+    "typer": (find_typer_app, "import typer\napp = typer.Typer()\n"),
+    "argparse": (find_argparse_usage, "import argparse\nparser = argparse.ArgumentParser()\n"),
+}
+
+
+class TestScanEntries:
+    """Tests that the fused _scan_entries walk agrees with the find_* helpers."""
+
+    @staticmethod
+    def expected(entry_type, tree):
+        finder = ENTRY_SNIPPETS[entry_type][0]
+        result = finder(tree)
+        if isinstance(result, list):
+            return result
+        return [] if result is None else [result]
+
+    @pytest.mark.parametrize("entry_type", sorted(ENTRY_SNIPPETS))
+    def test_matches_finder(self, entry_type):
+        tree = ast.parse(ENTRY_SNIPPETS[entry_type][1])
+        expected = self.expected(entry_type, tree)
+        assert expected
+        assert _scan_entries(tree).get(entry_type, []) == expected
+
+    def test_all_types_in_one_file(self):
+        tree = ast.parse("".join(source for _, source in ENTRY_SNIPPETS.values()))
+        found = _scan_entries(tree)
+        for entry_type in ENTRY_SNIPPETS:
+            assert found.get(entry_type, []) == self.expected(entry_type, tree)
+
+    def test_types_filter(self):
+        tree = ast.parse("".join(source for _, source in ENTRY_SNIPPETS.values()))
+        assert set(_scan_entries(tree, {"flask", "typer"})) == {"flask", "typer"}
+
+    def test_no_entries(self):
+        assert _scan_entries(NEG_TREE) == {}
+
+
+class TestRunFindEntriesParallel:
+    """Tests for run_find_entries' process pool path."""
+
+    def test_parallel_matches_sequential(self, tmp_path):
+        for i in range(8):
+            (tmp_path / f"cli{i}.py").write_text(
+                "import argparse\n\nif __name__ == '__main__':\n    argparse.ArgumentParser()\n"
+            )
+        seq = run_find_entries(str(tmp_path))
+        par = run_find_entries(str(tmp_path), parallel=2)
+        assert par == seq
+        assert len(par["entry_points"]) == 16
+
+
+class TestScanFile:
+    """Tests for find_entries.scan_file."""
+
+    def test_file_without_sentinels_is_not_parsed(self, tmp_path, monkeypatch):
+        f = tmp_path / "plain.py"
+        f.write_text("def helper():\n    return 1\n")
+        monkeypatch.setattr(find_entries, "compile", lambda *a, **k: pytest.fail("parsed"), raising=False)
+        assert find_entries.scan_file(f) == {}
+
+    def test_sentinels_follow_types_filter(self, tmp_path):
+        f = tmp_path / "cli.py"
+        f.write_text("if __name__ == '__main__':\n    pass\n")
+        assert find_entries.scan_file(f, frozenset({"flask"})) == {}
+        assert find_entries.scan_file(f, frozenset({"main_block"})) == {"main_block": [1]}
+
+    def test_accepts_plain_set_filter(self, tmp_path):
+        f = tmp_path / "cli.py"
+        f.write_text("if __name__ == '__main__':\n    pass\n")
+        entries = find_entries.analyze_file(f, {"main_block"})
+        assert entries == [{"file": str(f), "type": "main_block", "line": 1}]
+
+    def test_honors_coding_declaration(self, tmp_path):
+        f = tmp_path / "latin.py"
+        f.write_bytes(b"# -*- coding: latin-1 -*-\nx = '\xe9'\nif __name__ == '__main__':\n    pass\n")
+        assert find_entries.scan_file(f) == {"main_block": [3]}
+
+
+class TestFindEntriesCache:
+    """Tests for run_find_entries' opt-in on-disk cache."""
+
+    @pytest.fixture(autouse=True)
+    def _cache_dir(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(internal.cache, "CACHE_DIR", tmp_path / "cache")
+
+    def _project(self, tmp_path):
+        src = tmp_path / "src"
+        src.mkdir()
+        (src / "cli.py").write_text("import argparse\n\nif __name__ == '__main__':\n    argparse.ArgumentParser()\n")
+        (src / "app.py").write_text("from flask import Flask\napp = Flask(__name__)\n")
+        return src
+
+    def test_warm_run_matches_and_skips_parsing(self, tmp_path, monkeypatch):
+        src = self._project(tmp_path)
+        cold = find_entries.run_find_entries(str(src), cache=True)
+
+        def no_scan(*args, **kwargs):
+            raise AssertionError("cached file was re-scanned")
+
+        monkeypatch.setattr(find_entries, "_scan_entries", no_scan)
+        warm = find_entries.run_find_entries(str(src), cache=True)
+        assert warm == cold
+
+    def test_types_filter_applies_to_cached_results(self, tmp_path):
+        src = self._project(tmp_path)
+        run_find_entries(str(src), types="flask", cache=True)
+        result = run_find_entries(str(src), types="main_block,argparse", cache=True)
+        assert result == run_find_entries(str(src), types="main_block,argparse")
+        assert {e["type"] for e in result["entry_points"]} == {"main_block", "argparse"}
 
 
 # --- analyze.py core function tests ---
 
+# Sources for TestExtractStructure
+STRUCTURE_SOURCES = {
+    "extracts_class": "class Foo:\n    def bar(self): pass\n",
+    "extracts_function": "def hello(name, greeting='hi'): pass\n",
+    "class_inheritance": "class Child(Parent, Mixin):\n    pass\n",
+    "class_no_bases": "class Simple:\n    pass\n",
+    "docstring_extraction": 'class Foo:\n    """My class docstring."""\n    pass\n',
+    "function_docstring": 'def foo():\n    """Does stuff."""\n    pass\n',
+    "no_docstring": "def foo():\n    pass\n",
+    "decorator_extraction": "@dataclass\nclass Config:\n    pass\n",
+    "function_decorators": "@app.route('/api')\ndef handler():\n    pass\n",
+    "type_annotations": "def greet(name: str, age: int) -> str:\n    pass\n",
+    "no_type_hints": "def foo(x, y):\n    pass\n",
+    "async_function": "async def fetch(url: str) -> dict:\n    pass\n",
+}
+
+# Parsed once; extract_structure takes the tree and skips reading the file
+STRUCTURE_TREES = {name: ast.parse(source) for name, source in STRUCTURE_SOURCES.items()}
+
+
 class TestExtractStructure:
     """Tests for extract_structure."""
 
-    def setup_method(self):
-        from analyze import extract_structure
-        self.extract = extract_structure
+    extract = staticmethod(extract_structure)
 
-    def test_extracts_class(self, tmp_path):
-        f = tmp_path / "test.py"
-        f.write_text("class Foo:\n    def bar(self): pass\n")
-        result = self.extract(f)
+    def structure(self, name: str) -> dict | None:
+        """Extract structure from a pre-parsed STRUCTURE_SOURCES snippet."""
+        return self.extract(Path(f"{name}.py"), STRUCTURE_TREES[name])
+
+    def test_extracts_class(self):
+        result = self.structure("extracts_class")
         assert result is not None
         assert len(result["classes"]) == 1
         assert result["classes"][0]["name"] == "Foo"
         assert "bar" in result["classes"][0]["methods"]
 
-    def test_extracts_function(self, tmp_path):
-        f = tmp_path / "test.py"
-        f.write_text("def hello(name, greeting='hi'): pass\n")
-        result = self.extract(f)
+    def test_extracts_function(self):
+        result = self.structure("extracts_function")
         assert result is not None
         assert len(result["functions"]) == 1
         assert result["functions"][0]["name"] == "hello"
         assert "name" in result["functions"][0]["params"]
 
     def test_empty_file(self, tmp_path):
+        """Reads and parses the file itself when no tree is given."""
         f = tmp_path / "empty.py"
         f.write_text("")
         result = self.extract(f)
@@ -401,92 +774,320 @@ class TestExtractStructure:
         result = self.extract(f)
         assert result is None
 
-    def test_class_inheritance(self, tmp_path):
-        f = tmp_path / "test.py"
-        f.write_text("class Child(Parent, Mixin):\n    pass\n")
-        result = self.extract(f)
+    def test_class_inheritance(self):
+        result = self.structure("class_inheritance")
         assert result is not None
         assert result["classes"][0]["bases"] == ["Parent", "Mixin"]
 
-    def test_class_no_bases(self, tmp_path):
-        f = tmp_path / "test.py"
-        f.write_text("class Simple:\n    pass\n")
-        result = self.extract(f)
+    def test_class_no_bases(self):
+        result = self.structure("class_no_bases")
         assert result is not None
         assert "bases" not in result["classes"][0]
 
-    def test_docstring_extraction(self, tmp_path):
-        f = tmp_path / "test.py"
-        f.write_text('class Foo:\n    """My class docstring."""\n    pass\n')
-        result = self.extract(f)
+    def test_docstring_extraction(self):
+        result = self.structure("docstring_extraction")
         assert result is not None
         assert result["classes"][0]["docstring"] == "My class docstring."
 
-    def test_function_docstring(self, tmp_path):
-        f = tmp_path / "test.py"
-        f.write_text('def foo():\n    """Does stuff."""\n    pass\n')
-        result = self.extract(f)
+    def test_function_docstring(self):
+        result = self.structure("function_docstring")
         assert result is not None
         assert result["functions"][0]["docstring"] == "Does stuff."
 
-    def test_no_docstring(self, tmp_path):
-        f = tmp_path / "test.py"
-        f.write_text("def foo():\n    pass\n")
-        result = self.extract(f)
+    def test_no_docstring(self):
+        result = self.structure("no_docstring")
         assert result is not None
         assert "docstring" not in result["functions"][0]
 
-    def test_decorator_extraction(self, tmp_path):
-        f = tmp_path / "test.py"
-        f.write_text("@dataclass\nclass Config:\n    pass\n")
-        result = self.extract(f)
+    def test_decorator_extraction(self):
+        result = self.structure("decorator_extraction")
         assert result is not None
         assert result["classes"][0]["decorators"] == ["dataclass"]
 
-    def test_function_decorators(self, tmp_path):
-        f = tmp_path / "test.py"
-        f.write_text("@app.route('/api')\ndef handler():\n    pass\n")
-        result = self.extract(f)
+    def test_function_decorators(self):
+        result = self.structure("function_decorators")
         assert result is not None
         assert "app.route" in result["functions"][0]["decorators"]
 
-    def test_type_annotations(self, tmp_path):
-        f = tmp_path / "test.py"
-        f.write_text("def greet(name: str, age: int) -> str:\n    pass\n")
-        result = self.extract(f)
+    def test_type_annotations(self):
+        result = self.structure("type_annotations")
         assert result is not None
         func = result["functions"][0]
         assert func["type_hints"]["name"] == "str"
         assert func["type_hints"]["age"] == "int"
         assert func["returns"] == "str"
 
-    def test_no_type_hints(self, tmp_path):
-        f = tmp_path / "test.py"
-        f.write_text("def foo(x, y):\n    pass\n")
-        result = self.extract(f)
+    def test_no_type_hints(self):
+        result = self.structure("no_type_hints")
         assert result is not None
         assert "type_hints" not in result["functions"][0]
         assert "returns" not in result["functions"][0]
 
-    def test_async_function(self, tmp_path):
-        f = tmp_path / "test.py"
-        f.write_text("async def fetch(url: str) -> dict:\n    pass\n")
-        result = self.extract(f)
+    def test_async_function(self):
+        result = self.structure("async_function")
         assert result is not None
         func = result["functions"][0]
         assert func["name"] == "fetch"
         assert func["async"] is True
         assert func["returns"] == "dict"
 
+    def test_accepts_preparsed_tree(self, tmp_path):
+        """A supplied tree is used instead of re-reading the file."""
+        f = tmp_path / "test.py"
+        f.write_text("def on_disk(): pass\n")
+        tree = ast.parse("def in_memory(): pass\n")
+        result = self.extract(f, tree)
+        assert result is not None
+        assert result["functions"][0]["name"] == "in_memory"
+
+
+class TestDotted:
+    """Tests for analyze._dotted."""
+
+    dotted = staticmethod(_dotted)
+
+    @pytest.mark.parametrize("src", ["x", "a.b", "pkg.mod.Class", "list[int]", "'Forward'", "f().attr", "int | None"])
+    def test_matches_unparse(self, src):
+        node = ast.parse(src, mode="eval").body
+        assert self.dotted(node) == ast.unparse(node)
+
+
+class TestSearchPattern:
+    """Tests for search_pattern."""
+
+    search = staticmethod(search_pattern)
+
+    def test_finds_nested_definitions(self, tmp_path):
+        """Definitions nested in classes and try/except blocks are found."""
+        f = tmp_path / "test.py"
+        f.write_text(
+            "class Loader:\n"
+            "    def load_config(self): pass\n"
+            "try:\n"
+            "    pass\n"
+            "except ImportError:\n"
+            "    def load_fallback(): pass\n"
+        )
+        matches = self.search(f, "load")
+        names = {m["name"] for m in matches}
+        assert names == {"Loader", "load_config", "load_fallback"}
+
+    def test_no_match(self, tmp_path):
+        f = tmp_path / "test.py"
+        f.write_text("def foo(): pass\n")
+        assert self.search(f, "bar") == []
+
+    def test_order_matches_ast_walk(self, tmp_path):
+        f = tmp_path / "test.py"
+        source = (
+            "try:\n"
+            "    def f_body(): pass\n"
+            "except ImportError:\n"
+            "    def f_handler(): pass\n"
+            "else:\n"
+            "    def f_else(): pass\n"
+            "    class F_else_cls:\n"
+            "        def f_method(self): pass\n"
+            "finally:\n"
+            "    def f_final(): pass\n"
+            "def f_top(): pass\n"
+        )
+        f.write_text(source)
+        expected = [
+            node.name for node in ast.walk(ast.parse(source))
+            if isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef))
+        ]
+        assert [m["name"] for m in self.search(f, "f_")] == expected
+
+
+class TestCompilePattern:
+    """Tests for the compile_pattern prefilter used by --pattern alone."""
+
+    compile = staticmethod(compile_pattern)
+
+    @pytest.mark.parametrize("source", [
+        b"class ConfigLoader:\n",
+        b"    def load_config(self): pass\n",
+        b"async def fetch_config(): pass\n",
+        b"class Config[T]:\n",
+    ])
+    def test_finds_definitions(self, source):
+        assert self.compile("config").search(source)
+
+    def test_non_ascii_names(self):
+        assert self.compile("sagen").search("def grüße_sagen(): pass\n".encode())
+
+    def test_ignores_non_definitions(self):
+        assert not self.compile("config").search(b"config = load_config()\n")
+
+    def test_pattern_is_literal(self):
+        assert not self.compile("a.c").search(b"def abc(): pass\n")
+
+    def test_pattern_only_run_confirms_regex_hits(self, tmp_path):
+        (tmp_path / "doc.py").write_text(
+            '"""Example:\n\ndef demo_in_docstring(): pass\n"""\n'
+            "def demo_real(): pass\n"
+        )
+        (tmp_path / "py2.py").write_text("def demo_py2():\n    print 'hi'\n")
+        fast = analyze.run_analyze(str(tmp_path), pattern="demo")
+        full = analyze.run_analyze(str(tmp_path), pattern="demo", structure=True)
+        assert [m["name"] for m in fast["matches"]] == ["demo_real"]
+        assert fast["matches"] == full["matches"]
+
+
+class TestMayContain:
+    """Tests for the analyze._may_contain prefilter."""
+
+    check = staticmethod(_may_contain)
+
+    def test_case_insensitive(self):
+        assert self.check(b"class ConfigLoader:", "configloader")
+        assert self.check(b"class configloader:", "ConfigLoader")
+
+    def test_absent(self):
+        assert not self.check(b"def foo(): pass", "bar")
+
+    def test_non_ascii_pattern_never_rejected(self):
+        assert self.check(b"x = 1", "gr\u00fc\u00dfe")
+
+
+class TestReadAhead:
+    """Tests for analyze._read_ahead."""
+
+    def test_yields_in_order_with_missing_files(self, tmp_path):
+        paths = []
+        for i in range(10):
+            p = tmp_path / f"f{i}.py"
+            p.write_bytes(f"x = {i}\n".encode())
+            paths.append(p)
+        paths.insert(3, tmp_path / "missing.py")
+        contents = list(_read_ahead(paths, depth=4))
+        assert contents[3] is None
+        assert [c for c in contents if c is not None] == [f"x = {i}\n".encode() for i in range(10)]
+
+
+class TestRelativePath:
+    """Tests for analyze._relative_path."""
+
+    rel = staticmethod(_relative_path)
+
+    def test_strips_prefix(self):
+        assert self.rel("/proj/pkg/mod.py", "/proj/", Path("/proj")) == "pkg/mod.py"
+
+    def test_root_base(self):
+        assert self.rel("/mod.py", "/", Path("/")) == "mod.py"
+
+    def test_outside_base_unchanged(self):
+        assert self.rel("/other/mod.py", "/proj/", Path("/proj")) == "/other/mod.py"
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="kills a worker with SIGKILL")
+class TestSharedPool:
+    """Tests for internal.pool's shared worker pool."""
+
+    def test_broken_pool_is_replaced(self, tmp_path):
+        files = [tmp_path / f"f{i}.py" for i in range(8)]
+        assert internal.pool.pool_map(os.fspath, files, 2) == [str(f) for f in files]
+        pool = internal.pool._POOL
+        os.kill(next(iter(pool._processes)), signal.SIGKILL)
+        deadline = time.monotonic() + 10
+        while not pool._broken and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert pool._broken
+        assert internal.pool.pool_map(os.fspath, files, 2) == [str(f) for f in files]
+        assert internal.pool._POOL is not pool
+
+
+class TestRunAnalyzeParallel:
+    """Tests for run_analyze's process pool path."""
+
+    def test_parallel_matches_sequential(self, tmp_path):
+        for i in range(8):
+            (tmp_path / f"mod{i}.py").write_text(f"class Widget{i}:\n    def run(self): pass\n")
+        seq = analyze.run_analyze(str(tmp_path), pattern="Widget", structure=True)
+        par = analyze.run_analyze(str(tmp_path), pattern="Widget", structure=True, parallel=2)
+        assert par["structure"] == seq["structure"]
+        assert sorted(m["name"] for m in par["matches"]) == sorted(m["name"] for m in seq["matches"])
+
+    def test_pool_reused_across_calls(self, tmp_path):
+        for i in range(8):
+            (tmp_path / f"mod{i}.py").write_text("x = 1\n")
+        analyze.run_analyze(str(tmp_path), structure=True, parallel=2)
+        pool = internal.pool._POOL
+        analyze.run_analyze(str(tmp_path), structure=True, parallel=2)
+        run_find_entries(str(tmp_path), parallel=2)
+        assert pool is not None
+        assert internal.pool._POOL is pool
+
+    @pytest.mark.parametrize("pattern,structure", [
+        ("Widget", False), (None, True), ("Widget", True), (None, False),
+    ])
+    def test_selected_worker_pickles(self, pattern, structure):
+        worker = analyze._select_worker(pattern, structure)
+        assert pickle.loads(pickle.dumps(worker))
+
+
+class TestStructureCache:
+    """Tests for run_analyze's opt-in on-disk structure cache."""
+
+    @pytest.fixture(autouse=True)
+    def _cache_dir(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(internal.cache, "CACHE_DIR", tmp_path / "cache")
+
+    def _project(self, tmp_path):
+        src = tmp_path / "src"
+        src.mkdir()
+        (src / "a.py").write_text("class Widget:\n    def run(self): pass\n")
+        (src / "b.py").write_text("def helper(x): return x\n")
+        return src
+
+    def test_warm_run_matches_and_skips_parsing(self, tmp_path, monkeypatch):
+        src = self._project(tmp_path)
+        cold = analyze.run_analyze(str(src), structure=True, cache=True)
+
+        def no_parse(*args, **kwargs):
+            raise AssertionError("cached file was re-parsed")
+
+        monkeypatch.setattr(analyze, "_parse", no_parse)
+        warm = analyze.run_analyze(str(src), structure=True, cache=True)
+        assert warm == cold
+
+    def test_changed_file_is_reanalyzed(self, tmp_path):
+        src = self._project(tmp_path)
+        analyze.run_analyze(str(src), structure=True, cache=True)
+        (src / "b.py").write_text("def helper(x, y): return x\n\ndef other(): pass\n")
+        result = analyze.run_analyze(str(src), structure=True, cache=True)
+        funcs = result["structure"]["b.py"]["functions"]
+        assert [f["name"] for f in funcs] == ["helper", "other"]
+
+    def test_pattern_with_cached_structure(self, tmp_path):
+        src = self._project(tmp_path)
+        cold = analyze.run_analyze(str(src), pattern="widget", structure=True, cache=True)
+        warm = analyze.run_analyze(str(src), pattern="widget", structure=True, cache=True)
+        assert warm == cold
+        assert warm["match_count"] == 1
+
+    def test_no_cache_writes_nothing(self, tmp_path):
+        src = self._project(tmp_path)
+        analyze.run_analyze(str(src), structure=True)
+        assert not (tmp_path / "cache").exists()
+
+    def test_malformed_entries_are_misses(self, tmp_path):
+        src = self._project(tmp_path)
+        cold = analyze.run_analyze(str(src), structure=True, cache=True)
+        (cache_path,) = (tmp_path / "cache").iterdir()
+        entries = orjson.loads(cache_path.read_bytes())
+        cache_path.write_bytes(orjson.dumps(dict.fromkeys(entries, 5)))
+        warm = analyze.run_analyze(str(src), structure=True, cache=True)
+        assert warm["structure"] == cold["structure"]
+
 
 # --- compare.py core function tests ---
 
 class TestCompareTraces:
     """Tests for compare_traces."""
 
-    def setup_method(self):
-        from compare import compare_traces
-        self.compare = compare_traces
+    compare = staticmethod(compare_traces)
 
     def test_identical_traces(self):
         trace = {"files": ["a.py", "b.py"], "graph": {}, "external": ["click"]}
@@ -546,3 +1147,35 @@ class TestCompareTraces:
         t2 = {"files": ["a.py", "c.py"], "graph": {}, "external": []}
         result = self.compare(t1, t2)
         assert "common" in result["summary"]
+
+
+class TestRunCompareEntries:
+    """Tests for run_compare in --entry mode (tracing stubbed out)."""
+
+    def test_traces_in_entry_order(self, tmp_path, monkeypatch):
+        first = tmp_path / "first.py"
+        second = tmp_path / "second.py"
+        first.write_text("x = 1\n")
+        second.write_text("y = 2\n")
+        fake = {
+            first: {"files": ["first.py", "shared.py"], "call_graph": {}, "external": {}},
+            second: {"files": ["second.py", "shared.py"], "call_graph": {}, "external": {}},
+        }
+        monkeypatch.setattr(compare, "run_trace_for_entry", fake.get)
+        result = compare.run_compare(entry_files=[str(first), str(second)])
+        assert result["only_in_first"] == ["first.py"]
+        assert result["only_in_second"] == ["second.py"]
+
+    def test_failed_trace_reported(self, tmp_path, monkeypatch):
+        first = tmp_path / "first.py"
+        second = tmp_path / "second.py"
+        first.write_text("x = 1\n")
+        second.write_text("y = 2\n")
+        monkeypatch.setattr(
+            compare, "run_trace_for_entry",
+            lambda p: None if p == second else {"files": []},
+        )
+        result = compare.run_compare(entry_files=[str(first), str(second)])
+        assert result["status"] == "error"
+        assert result["error_type"] == "trace_error"
+        assert result["details"]["path"] == str(second)
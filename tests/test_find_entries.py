@@ -1,51 +1,35 @@
 """Tests for find_entries.py script."""
 
-import json
-import subprocess
-import sys
 from pathlib import Path
 
+import orjson
 import pytest
 
 # Paths
 TESTS_DIR = Path(__file__).parent
-PROJECT_ROOT = TESTS_DIR.parent
-SCRIPTS_DIR = PROJECT_ROOT / "skills" / "codebase-analyzer" / "scripts"
 FIXTURES_DIR = TESTS_DIR / "fixtures" / "sample_project"
 
 
-def run_script(script_name: str, *args: str, cwd: Path | None = None) -> subprocess.CompletedProcess:
-    """Run a script and return the result."""
-    script_path = SCRIPTS_DIR / script_name
-    cmd = [sys.executable, str(script_path)] + list(args)
-    return subprocess.run(
-        cmd,
-        capture_output=True,
-        text=True,
-        cwd=cwd or SCRIPTS_DIR,
-    )
-
-
 class TestFindEntriesBasic:
     """Basic find_entries.py tests."""
 
-    def test_find_entries_in_fixture(self):
+    def test_find_entries_in_fixture(self, fixture_entries):
         """Test finding entries in sample project."""
-        result = run_script("find_entries.py", str(FIXTURES_DIR))
+        result = fixture_entries
         assert result.returncode == 0
 
-        data = json.loads(result.stdout)
+        data = orjson.loads(result.stdout)
         assert data["status"] == "success"
         assert "entry_points" in data
         assert "files_scanned" in data
         assert data["files_scanned"] > 0
 
-    def test_find_main_block(self):
+    def test_find_main_block(self, run_main):
         """Test detecting if __name__ == '__main__' block."""
-        result = run_script("find_entries.py", str(FIXTURES_DIR), "--types", "main_block")
+        result = run_main("find_entries.py", str(FIXTURES_DIR), "--types", "main_block")
         assert result.returncode == 0
 
-        data = json.loads(result.stdout)
+        data = orjson.loads(result.stdout)
         entry_points = data["entry_points"]
 
         # Should find main.py's main block
@@ -53,12 +37,12 @@ class TestFindEntriesBasic:
         assert len(main_entries) > 0
         assert main_entries[0]["type"] == "main_block"
 
-    def test_find_entries_nonexistent_directory(self):
+    def test_find_entries_nonexistent_directory(self, run_main):
         """Test with non-existent directory."""
-        result = run_script("find_entries.py", "/nonexistent/directory")
+        result = run_main("find_entries.py", "/nonexistent/directory")
         assert result.returncode == 1
 
-        data = json.loads(result.stdout)
+        data = orjson.loads(result.stdout)
         assert data["status"] == "error"
         assert data["error_type"] == "directory_not_found"
 
@@ -66,27 +50,27 @@ class TestFindEntriesBasic:
 class TestFindEntriesTypes:
     """Test find_entries.py type filtering."""
 
-    def test_multiple_types(self):
+    def test_multiple_types(self, run_main):
         """Test filtering by multiple types."""
-        result = run_script(
+        result = run_main(
             "find_entries.py", str(FIXTURES_DIR),
             "--types", "main_block,argparse"
         )
         assert result.returncode == 0
 
-        data = json.loads(result.stdout)
+        data = orjson.loads(result.stdout)
         for entry in data["entry_points"]:
             assert entry["type"] in ("main_block", "argparse")
 
-    def test_invalid_type(self):
+    def test_invalid_type(self, run_main):
         """Test with invalid entry type."""
-        result = run_script(
+        result = run_main(
             "find_entries.py", str(FIXTURES_DIR),
             "--types", "invalid_type"
         )
         assert result.returncode == 1
 
-        data = json.loads(result.stdout)
+        data = orjson.loads(result.stdout)
         assert data["status"] == "error"
         assert data["error_type"] == "invalid_types"
 
@@ -94,23 +78,23 @@ class TestFindEntriesTypes:
 class TestFindEntriesOutput:
     """Test find_entries.py output structure."""
 
-    def test_entry_point_structure(self):
+    def test_entry_point_structure(self, fixture_entries):
         """Test that entry points have required fields."""
-        result = run_script("find_entries.py", str(FIXTURES_DIR))
+        result = fixture_entries
         assert result.returncode == 0
 
-        data = json.loads(result.stdout)
+        data = orjson.loads(result.stdout)
         for entry in data["entry_points"]:
             assert "file" in entry
             assert "type" in entry
             assert "line" in entry
             assert isinstance(entry["line"], int)
 
-    def test_duration_in_response(self):
+    def test_duration_in_response(self, fixture_entries):
         """Test that response includes duration."""
-        result = run_script("find_entries.py", str(FIXTURES_DIR))
+        result = fixture_entries
         assert result.returncode == 0
 
-        data = json.loads(result.stdout)
+        data = orjson.loads(result.stdout)
         assert "duration_ms" in data
         assert isinstance(data["duration_ms"], int)